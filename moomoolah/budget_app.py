@@ -1,12 +1,19 @@
 import argparse
+import operator
 import os
+import threading
+from contextlib import suppress
 from datetime import date
 from decimal import Decimal
+from functools import lru_cache
+from typing import Sequence
 
+from rich.style import Style
 from rich.text import Text
 from textual import on, work
 from textual.app import App, ComposeResult
 from textual.containers import Grid, Container, Horizontal
+from textual.coordinate import Coordinate
 from textual.events import Key
 from textual.screen import ModalScreen, Screen
 from textual.widgets import (
@@ -19,11 +26,13 @@ from textual.widgets import (
     RadioButton,
     RadioSet,
 )
+from textual.worker import WorkerFailed
 
 from moomoolah.state import (
     EntryType,
     FinancialEntry,
     FinancialState,
+    MonthlyForecast,
     Recurrence,
     RecurrenceType,
     format_currency,
@@ -31,6 +40,31 @@ from moomoolah.state import (
 )
 from moomoolah.widgets import ConfirmationModal
 
+SHOW_MORE_ROW_KEY = "show_more"
+
+# styles shared by all the amount cells, instead of parsing a style string per cell
+_AMOUNT_STYLE = Style(bold=True)
+_NEGATIVE_BALANCE_STYLE = Style(color="red", bold=True)
+_POSITIVE_BALANCE_STYLE = Style(color="blue", bold=True)
+
+# maps the recurrence radio button labels to their recurrence type
+_RECURRENCE_BY_LABEL = {rt.name: rt for rt in RecurrenceType}
+
+
+def _amount_text(
+    amount: Decimal, currency_code: str, style: Style = _AMOUNT_STYLE
+) -> Text:
+    """Return the (shared) cell for an amount, so that resyncing a table
+    doesn't re-create the cells of amounts that were already rendered."""
+    # keyed on the formatted amount rather than the Decimal, as -0 and 0 are
+    # equal as keys, but don't format the same
+    return _amount_cell(format_currency(amount, currency_code), style)
+
+
+@lru_cache(maxsize=1024)
+def _amount_cell(formatted_amount: str, style: Style) -> Text:
+    return Text(formatted_amount, style=style, justify="right")
+
 
 class CurrencySettingsModal(ModalScreen[str]):
     """Modal for selecting currency settings."""
@@ -40,12 +74,15 @@ class CurrencySettingsModal(ModalScreen[str]):
     def __init__(self, current_currency: str) -> None:
         super().__init__()
         self.current_currency = current_currency
+        # the currency of each radio button, in the order they are composed
+        self._currency_codes = tuple(CURRENCY_FORMATS)
 
     def compose(self) -> ComposeResult:
         with Container(id="currency_settings_container"):
             yield Label("Select Currency", id="currency_title")
             with RadioSet(id="currency_radio_set"):
-                for currency_code, currency_format in CURRENCY_FORMATS.items():
+                for currency_code in self._currency_codes:
+                    currency_format = CURRENCY_FORMATS[currency_code]
                     yield RadioButton(
                         f"{currency_format.symbol} {currency_code}",
                         value=currency_code == self.current_currency,
@@ -59,18 +96,14 @@ class CurrencySettingsModal(ModalScreen[str]):
     def on_cancel(self) -> None:
         self.app.pop_screen()
 
+    def on_mount(self) -> None:
+        self.radio_set = self.query_one("#currency_radio_set", RadioSet)
+
     @on(Button.Pressed, "#ok_button")
     def on_ok(self) -> None:
-        radio_set = self.query_one(RadioSet)
-        selected_currency = None
-
-        for radio in radio_set.query(RadioButton):
-            if radio.value:
-                selected_currency = radio.id.replace("currency_", "")
-                break
-
-        if selected_currency:
-            self.dismiss(selected_currency)
+        pressed_index = self.radio_set.pressed_index
+        if pressed_index >= 0:
+            self.dismiss(self._currency_codes[pressed_index])
         else:
             self.app.pop_screen()
 
@@ -138,7 +171,7 @@ class UpdateEntryModal(ModalScreen):
 
     def compose(self) -> ComposeResult:
         yield Label("", classes="modal-title-before")
-        yield Label(self.modal_title, classes="modal-title")
+        yield Label(self.modal_title, id="modal_title", classes="modal-title")
         with Grid(id="update-entry-form"):
             yield Label("Description:")
             yield Input(value=self.entry.description, id="entry_description")
@@ -177,24 +210,56 @@ class UpdateEntryModal(ModalScreen):
             yield Button("Save", id="entry_save", variant="primary")
             yield Button("Cancel", id="entry_cancel")
 
+    def on_mount(self) -> None:
+        # look up the form fields once, instead of on every save
+        self.title_label = self.query_one("#modal_title", Label)
+        self.description_input = self.query_one("#entry_description", Input)
+        self.amount_input = self.query_one("#entry_amount", Input)
+        self.category_input = self.query_one("#entry_category", Input)
+        self.recurrence_radio_set = self.query_one("#entry_recurrence", RadioSet)
+        self.start_date_input = self.query_one("#entry_start_date", Input)
+        self.every_input = self.query_one("#entry_every", Input)
+        self.end_date_input = self.query_one("#end_date", Input)
+
+    def load(self, entry: FinancialEntry, modal_title="Update Entry") -> None:
+        """Reset the form to edit another entry, reusing the mounted widgets."""
+        self.entry = entry
+        self.modal_title = modal_title
+        if not self.is_mounted:
+            return  # compose will use the new entry
+
+        self.title_label.update(modal_title)
+        recurrence = entry.recurrence
+        end_date_value = str(recurrence.end_date) if recurrence.end_date else ""
+        for field, value in (
+            (self.description_input, entry.description),
+            (self.amount_input, str(entry.amount)),
+            (self.category_input, str(entry.category)),
+            (self.start_date_input, str(recurrence.start_date)),
+            (self.every_input, str(recurrence.every)),
+            (self.end_date_input, end_date_value),
+        ):
+            field.value = value
+            field.cursor_position = len(value)
+        for button in self.recurrence_radio_set.query(RadioButton):
+            if button.label.plain == recurrence.type.name:
+                button.value = True  # the radio set turns the others off
+        self.set_focus(self.description_input)
+
     def _get_values(self):
         def get_date_or_none(value):
             return date.fromisoformat(value) if value else None
 
         return {
-            "description": self.query_one("#entry_description", Input).value,
-            "amount": Decimal(self.query_one("#entry_amount", Input).value),
-            "category": self.query_one("#entry_category", Input).value,
-            "recurrence_type": RecurrenceType[
-                str(
-                    self.query_one("#entry_recurrence", RadioSet).pressed_button.label
-                ).upper()
+            "description": self.description_input.value,
+            "amount": Decimal(self.amount_input.value),
+            "category": self.category_input.value,
+            "recurrence_type": _RECURRENCE_BY_LABEL[
+                self.recurrence_radio_set.pressed_button.label.plain
             ],
-            "start_date": date.fromisoformat(
-                self.query_one("#entry_start_date", Input).value
-            ),
-            "every": int(self.query_one("#entry_every", Input).value),
-            "end_date": get_date_or_none(self.query_one("#end_date", Input).value),
+            "start_date": date.fromisoformat(self.start_date_input.value),
+            "every": int(self.every_input.value),
+            "end_date": get_date_or_none(self.end_date_input.value),
         }
 
     @on(Button.Pressed, "#entry_save")
@@ -209,6 +274,7 @@ class UpdateEntryModal(ModalScreen):
                 type=values["recurrence_type"],
                 start_date=values["start_date"],
                 every=values["every"],
+                end_date=values["end_date"],
             ),
         )
         self.dismiss(entry)
@@ -307,16 +373,20 @@ class MonthDetailModal(ModalScreen):
         # Sort by category name for consistent display
         categories_data.sort(key=lambda x: x[0])
 
-        for category, entry_type, amount, color_style in categories_data:
-            summary_table.add_row(
-                category,
-                Text(entry_type, style=color_style),
-                Text(
-                    format_currency(amount, self.state.currency_code),
-                    style=f"{color_style} bold",
-                    justify="right",
-                ),
-            )
+        summary_table.add_rows(
+            [
+                (
+                    category,
+                    Text(entry_type, style=color_style),
+                    Text(
+                        format_currency(amount, self.state.currency_code),
+                        style=f"{color_style} bold",
+                        justify="right",
+                    ),
+                )
+                for category, entry_type, amount, color_style in categories_data
+            ]
+        )
 
     def _populate_details_table(self) -> None:
         """Populate the details table with individual entries."""
@@ -328,34 +398,45 @@ class MonthDetailModal(ModalScreen):
             self.entries, key=lambda e: (e.type.value, e.description)
         )
 
-        for entry in sorted_entries:
-            color_style = "green" if entry.type == EntryType.INCOME else "red"
-            type_text = "Income" if entry.type == EntryType.INCOME else "Expense"
-
-            details_table.add_row(
-                entry.description,
-                entry.category,
-                Text(type_text, style=color_style),
-                Text(
-                    format_currency(entry.amount, self.state.currency_code),
-                    style=f"{color_style} bold",
-                    justify="right",
-                ),
-            )
+        details_table.add_rows([self._entry_row(entry) for entry in sorted_entries])
+
+    def _entry_row(self, entry: FinancialEntry) -> tuple:
+        color_style = "green" if entry.type == EntryType.INCOME else "red"
+        type_text = "Income" if entry.type == EntryType.INCOME else "Expense"
+        return (
+            entry.description,
+            entry.category,
+            Text(type_text, style=color_style),
+            Text(
+                format_currency(entry.amount, self.state.currency_code),
+                style=f"{color_style} bold",
+                justify="right",
+            ),
+        )
 
 
-class ManageEntriesScreen(Screen[list[FinancialEntry]]):
+class ManageEntriesScreen(Screen[Sequence[FinancialEntry]]):
     BINDINGS = [
         ("backspace", "back", "Back"),
         ("escape", "back", "Back"),
         ("insert", "add_entry", "Add Entry"),
         ("delete", "delete_entry", "Delete Entry"),
+        ("m", "show_more", "Show More"),
     ]
 
+    # how many entries are rendered at a time, more are appended on demand
+    RENDER_BATCH_SIZE = 50
+    # extend the table when scrolled to within this many rows of the bottom
+    AUTO_EXTEND_THRESHOLD = 10
+    # fetches the fields shown in each row in a single call
+    _ROW_FIELDS = operator.attrgetter(
+        "description", "amount", "recurrence.description", "category"
+    )
+
     def __init__(
         self,
         entry_type: EntryType,
-        entries: list[FinancialEntry],
+        entries: Sequence[FinancialEntry],
         state: FinancialState,
         *args,
         **kwargs,
@@ -369,10 +450,16 @@ class ManageEntriesScreen(Screen[list[FinancialEntry]]):
         self.entry_type = entry_type
         self.entries = entries
         self.state = state
+        self._rendered = 0
 
     def action_back(self) -> None:
         self.dismiss(self.entries)
 
+    def _entries_changed(self) -> None:
+        # the state replaces its entry tuples on every change
+        self.entries = self.state.all_entries[self.entry_type]
+        self.app.mark_unsaved_changes()
+
     def compose(self) -> ComposeResult:
         yield Header()
         yield Footer()
@@ -381,46 +468,121 @@ class ManageEntriesScreen(Screen[list[FinancialEntry]]):
         yield DataTable(id="entries_table", cursor_type="row")
 
     def on_mount(self) -> None:
-        table = self.query_one("#entries_table", DataTable)
-        table.add_columns("Description", "Amount", "Recurrence", "Category")
+        self.entries_table = self.query_one("#entries_table", DataTable)
+        self.entries_table.add_columns(
+            "Description", "Amount", "Recurrence", "Category"
+        )
+        self.watch(self.entries_table, "scroll_y", self._on_table_scroll, init=False)
         self._sync_table()
 
     def _sync_table(self) -> None:
-        table = self.query_one("#entries_table", DataTable)
-        self._sync_table_entries(table, self.entries)
+        self._sync_table_entries(self.entries_table, self.entries)
 
     def _sync_table_entries(
-        self, table: DataTable, entries: list[FinancialEntry]
+        self, table: DataTable, entries: Sequence[FinancialEntry]
     ) -> None:
-        table.clear()
+        # keep showing as many rows as before, so that a resync after an edit
+        # doesn't collapse the table back to the first batch
+        count = max(self._rendered, self.RENDER_BATCH_SIZE)
+        self._reset_table(table)
 
         if not entries:
             table.add_row(Text("No entries yet", style="italic"))
             return
 
-        for entry in entries:
+        self._append_batch(table, entries, 0, count)
+
+    def _reset_table(self, table: DataTable) -> None:
+        table.clear(columns=False)  # the columns are added once, on mount
+        self._rendered = 0
+
+    def _append_batch(
+        self,
+        table: DataTable,
+        entries: Sequence[FinancialEntry],
+        start: int,
+        count: int,
+    ) -> None:
+        """Render entries[start:start + count], followed by a "show more" row if
+        there are entries left to render."""
+        if SHOW_MORE_ROW_KEY in table.rows:
+            table.remove_row(SHOW_MORE_ROW_KEY)
+
+        # build all rows in a single pass and insert them in bulk
+        batch = entries[start : start + count]
+        table.add_rows([self._entry_row(entry) for entry in batch])
+        self._rendered = start + len(batch)
+
+        remaining = len(entries) - self._rendered
+        if remaining > 0:
             table.add_row(
-                entry.description,
                 Text(
-                    format_currency(entry.amount, self.state.currency_code),
-                    style="bold",
-                    justify="right",
+                    f"Show {min(remaining, self.RENDER_BATCH_SIZE)} more…",
+                    style="italic",
                 ),
-                entry.recurrence.description,
-                entry.category,
+                key=SHOW_MORE_ROW_KEY,
             )
 
+    def _entry_row(self, entry: FinancialEntry) -> tuple:
+        description, amount, recurrence, category = self._ROW_FIELDS(entry)
+        return (
+            description,
+            _amount_text(amount, self.state.currency_code),
+            recurrence,
+            category,
+        )
+
+    def _append_row(self, table: DataTable, entry: FinancialEntry) -> None:
+        """Render an entry that was just appended to self.entries."""
+        if self._rendered < len(self.entries) - 1:
+            # the new entry is behind the "show more" row, just update its count
+            self._append_batch(table, self.entries, self._rendered, 0)
+            return
+
+        if self._rendered == 0:
+            table.clear()  # remove the "No entries yet" placeholder
+        table.add_row(*self._entry_row(entry))
+        self._rendered += 1
+
+    def _update_row(
+        self, table: DataTable, row_index: int, entry: FinancialEntry
+    ) -> None:
+        for column, value in enumerate(self._entry_row(entry)):
+            table.update_cell_at(
+                Coordinate(row_index, column), value, update_width=True
+            )
+
+    def _remove_row(self, table: DataTable, row_index: int) -> None:
+        row_key, _ = table.coordinate_to_cell_key(Coordinate(row_index, 0))
+        table.remove_row(row_key)
+        self._rendered -= 1
+        if not self.entries:
+            table.add_row(Text("No entries yet", style="italic"))
+
+    def action_show_more(self) -> None:
+        if self._rendered >= len(self.entries):
+            return
+        self._append_batch(
+            self.entries_table, self.entries, self._rendered, self.RENDER_BATCH_SIZE
+        )
+
+    def _on_table_scroll(self, scroll_y: float) -> None:
+        if self.entries_table.max_scroll_y - scroll_y <= self.AUTO_EXTEND_THRESHOLD:
+            self.action_show_more()
+
     @work
     async def action_add_entry(self) -> None:
         modal_title = (
             "Add Expense" if self.entry_type == EntryType.EXPENSE else "Add Income"
         )
-        screen = UpdateEntryModal(FinancialEntry(type=self.entry_type), modal_title)
+        screen = self.app.get_update_entry_modal(
+            FinancialEntry(type=self.entry_type), modal_title
+        )
         result = await self.app.push_screen_wait(screen)
         if result:
-            self.entries.append(result)
-            self.app.mark_unsaved_changes()
-            self._sync_table()
+            self.state.add_entry(result)
+            self._entries_changed()
+            self._append_row(self.entries_table, result)
             if self.entry_type == EntryType.EXPENSE:
                 self.notify(
                     f"Added expense {result.description}", title="Expense added"
@@ -433,16 +595,20 @@ class ManageEntriesScreen(Screen[list[FinancialEntry]]):
         if not self.entries:
             return
 
-        table = self.query_one("#entries_table", DataTable)
-        entry = self.entries[table.cursor_row]
+        table = self.entries_table
+        row_index = table.cursor_row
+        if row_index >= self._rendered:
+            return  # the "show more" row is not an entry
+
+        entry = self.entries[row_index]
         screen = ConfirmationModal(
             f"Are you sure you want to delete '{entry.description}'?"
         )
         result = await self.app.push_screen_wait(screen)
         if result:
-            self.entries.pop(table.cursor_row)
-            self.app.mark_unsaved_changes()
-            self._sync_table()
+            self.state.remove_entry(entry)
+            self._entries_changed()
+            self._remove_row(table, row_index)
             self.notify("Entry deleted", title="Entry deleted")
 
     @work
@@ -452,14 +618,18 @@ class ManageEntriesScreen(Screen[list[FinancialEntry]]):
         if not self.entries:
             return
 
+        if event.row_key.value == SHOW_MORE_ROW_KEY:
+            self.action_show_more()
+            return
+
         entry = self.entries[event.cursor_row]
         new_entry = await self.app.push_screen_wait(
-            UpdateEntryModal(entry, f"Update {self.entry_type} Entry")
+            self.app.get_update_entry_modal(entry, f"Update {self.entry_type} Entry")
         )
         if new_entry:
-            self.entries[event.cursor_row] = new_entry
-            self.app.mark_unsaved_changes()
-            self._sync_table()
+            self.state.replace_entry(event.cursor_row, new_entry)
+            self._entries_changed()
+            self._update_row(self.entries_table, event.cursor_row, new_entry)
             self.notify(
                 f"Updated entry '{new_entry.description}'", title="Entry updated"
             )
@@ -469,6 +639,7 @@ class MainScreen(Screen):
     def __init__(self, state: FinancialState, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.state = state
+        self._sync_pending = False
 
     BINDINGS = [
         ("e", "manage_expenses", "Expenses"),
@@ -483,7 +654,7 @@ class MainScreen(Screen):
             EntryType.EXPENSE, self.state.expense_entries, self.state
         )
         await self.app.push_screen_wait(screen)
-        self._sync_table()
+        self._schedule_sync()
 
     @work
     async def action_manage_income(self) -> None:
@@ -491,7 +662,7 @@ class MainScreen(Screen):
             EntryType.INCOME, self.state.income_entries, self.state
         )
         await self.app.push_screen_wait(screen)
-        self._sync_table()
+        self._schedule_sync()
 
     @work
     async def action_add_entry(self) -> None:
@@ -503,19 +674,18 @@ class MainScreen(Screen):
 
         # Show the appropriate entry modal
         modal_title = "Add Expense" if entry_type == EntryType.EXPENSE else "Add Income"
-        new_entry = await self.app.push_screen_wait(
-            UpdateEntryModal(FinancialEntry(type=entry_type), modal_title)
+        screen = self.app.get_update_entry_modal(
+            FinancialEntry(type=entry_type), modal_title
         )
+        new_entry = await self.app.push_screen_wait(screen)
 
         if new_entry:
-            # Add entry to the appropriate list
+            self.state.add_entry(new_entry)
             if entry_type == EntryType.EXPENSE:
-                self.state.expense_entries.append(new_entry)
                 self.notify(
                     f"Added expense {new_entry.description}", title="Expense added"
                 )
             else:
-                self.state.income_entries.append(new_entry)
                 self.notify(
                     f"Added income {new_entry.description}", title="Income added"
                 )
@@ -524,7 +694,7 @@ class MainScreen(Screen):
             self.app.mark_unsaved_changes()
 
             # Refresh the forecast table
-            self._sync_table()
+            self._schedule_sync()
 
     @work
     async def action_currency_settings(self) -> None:
@@ -534,7 +704,7 @@ class MainScreen(Screen):
         if result:
             self.state.currency_code = result
             self.app.mark_unsaved_changes()
-            self._sync_table()
+            self._schedule_sync()
             self.notify(
                 f"Currency changed to {CURRENCY_FORMATS[result].symbol} {result}",
                 title="Currency Settings",
@@ -577,70 +747,55 @@ class MainScreen(Screen):
         yield Footer()
 
     def on_mount(self) -> None:
-        forecast_table = self.query_one("#forecast_table", DataTable)
-        forecast_table.add_columns("Month", "Expenses", "Income", "Balance")
+        self.forecast_table = self.query_one("#forecast_table", DataTable)
+        self.forecast_table.add_columns("Month", "Expenses", "Income", "Balance")
+
+        self.history_table = self.query_one("#history_table", DataTable)
+        self.history_table.add_columns("Month", "Expenses", "Income", "Balance")
 
-        history_table = self.query_one("#history_table", DataTable)
-        history_table.add_columns("Month", "Expenses", "Income", "Balance")
+        self._sync_table()
+
+    def _schedule_sync(self) -> None:
+        """Schedule a resync of the tables, coalescing the requests made before
+        it gets to run into a single one."""
+        if not self._sync_pending:
+            self._sync_pending = True
+            self.call_later(self._do_sync)
 
+    def _do_sync(self) -> None:
+        self._sync_pending = False
         self._sync_table()
 
     def _sync_table(self) -> None:
         # Update forecast table
-        forecast_table = self.query_one("#forecast_table", DataTable)
-        forecast_table.clear()
-        for month, forecast in self.state.get_forecast_for_next_n_months(12).items():
-            balance_style = (
-                "red bold" if forecast.balance < Decimal("0") else "blue bold"
-            )
-            forecast_table.add_row(
-                month.strftime("%B %Y"),
-                Text(
-                    format_currency(forecast.total_expenses, self.state.currency_code),
-                    style="bold",
-                    justify="right",
-                ),
-                Text(
-                    format_currency(forecast.total_income, self.state.currency_code),
-                    style="bold",
-                    justify="right",
-                ),
-                Text(
-                    format_currency(forecast.balance, self.state.currency_code),
-                    style=balance_style,
-                    justify="right",
-                ),
-            )
+        forecast_table = self.forecast_table
+        forecast_table.clear(columns=False)
+        forecast_data = self.state.get_forecast_for_next_n_months(12).items()
+        forecast_table.add_rows(
+            [self._forecast_row(month, forecast) for month, forecast in forecast_data]
+        )
 
         # Update history table
-        history_table = self.query_one("#history_table", DataTable)
-        history_table.clear()
+        history_table = self.history_table
+        history_table.clear(columns=False)
         # Get history in reverse chronological order (most recent first)
         history_data = list(self.state.get_forecast_for_previous_n_months(3).items())
         history_data.reverse()
+        history_table.add_rows(
+            [self._forecast_row(month, forecast) for month, forecast in history_data]
+        )
 
-        for month, forecast in history_data:
-            balance_style = (
-                "red bold" if forecast.balance < Decimal("0") else "blue bold"
-            )
-            history_table.add_row(
-                month.strftime("%B %Y"),
-                Text(
-                    format_currency(forecast.total_expenses, self.state.currency_code),
-                    style="bold",
-                    justify="right",
-                ),
-                Text(
-                    format_currency(forecast.total_income, self.state.currency_code),
-                    style="bold",
-                    justify="right",
-                ),
-                Text(
-                    format_currency(forecast.balance, self.state.currency_code),
-                    style=balance_style,
-                    justify="right",
-                ),
-            )
+    def _forecast_row(self, month: date, forecast: MonthlyForecast) -> tuple:
+        balance_style = (
+            _NEGATIVE_BALANCE_STYLE if forecast.balance < 0 else _POSITIVE_BALANCE_STYLE
+        )
+        currency_code = self.state.currency_code
+        return (
+            month.strftime("%B %Y"),
+            _amount_text(forecast.total_expenses, currency_code),
+            _amount_text(forecast.total_income, currency_code),
+            _amount_text(forecast.balance, currency_code, balance_style),
+        )
 
 
 class BudgetApp(App):
@@ -652,25 +807,33 @@ class BudgetApp(App):
         ("ctrl+s", "save_state", "Save"),
     ]
 
-    def __init__(self, state_file, *args, **kwargs):
+    def __init__(
+        self,
+        state_file=None,
+        *args,
+        state: FinancialState | None = None,
+        **kwargs,
+    ):
+        if state_file is None and state is None:
+            raise ValueError("Either a state file or a state must be given")
         super().__init__(*args, **kwargs)
 
-        if os.path.exists(state_file):
-            self.state = FinancialState.from_json_file(state_file)
-        else:
-            # if file doesn't exist, create a new one
-            self.state = FinancialState()
-            self.state.to_json_file(state_file)
-            self.notify(
-                f"Created file {os.path.basename(state_file)}",
-                title="Initialized state",
-            )
-
+        # unless given an in-memory state, the state is loaded by a worker once
+        # the app is mounted, so that the UI can be painted while the state file
+        # is being read and parsed
+        self.state = FinancialState()
+        self.state_loaded = False
         self.state_file = state_file
+        self._initial_state = state
         self.has_unsaved_changes = False
+        # bumped on every change, to tell whether a save covers all changes
+        self._change_count = 0
+        # serializes writes to the state file from the save workers
+        self._save_lock = threading.Lock()
 
     def mark_unsaved_changes(self) -> None:
         """Mark that there are unsaved changes and update the title."""
+        self._change_count += 1
         if not self.has_unsaved_changes:
             self.has_unsaved_changes = True
             self._update_title()
@@ -691,16 +854,94 @@ class BudgetApp(App):
 
     def compose(self) -> ComposeResult:
         yield Header()
-        yield Label("Loading...")
+        yield Label("Loading...", id="loading")
         yield Footer()
 
     def on_mount(self) -> None:
+        # a single entry form is kept around and reloaded for each edit, instead
+        # of composing and mounting a new one every time
+        self.install_screen(UpdateEntryModal(FinancialEntry()), name="update_entry")
+        if self._initial_state is not None:
+            self._on_state_loaded(self._initial_state, created=False)
+        else:
+            self._load_state()
+
+    def get_update_entry_modal(
+        self, entry: FinancialEntry, modal_title="Update Entry"
+    ) -> UpdateEntryModal:
+        """Return the entry form, loaded with the given entry."""
+        screen = self.get_screen("update_entry")
+        screen.load(entry, modal_title)
+        return screen
+
+    @work(thread=True, exclusive=True)
+    def _load_state(self) -> None:
+        created = False
+        try:
+            state = FinancialState.from_json_file(self.state_file)
+        except FileNotFoundError:
+            # if file doesn't exist, create a new one
+            state = FinancialState()
+            state.to_json_file(self.state_file)
+            created = True
+        self.call_from_thread(self._on_state_loaded, state, created)
+
+    def _on_state_loaded(self, state: FinancialState, created: bool) -> None:
+        self.state = state
+        self.state_loaded = True
+        self.query_one("#loading", Label).remove()
         self.push_screen(MainScreen(self.state))
+        if created:
+            self.notify(
+                f"Created file {os.path.basename(self.state_file)}",
+                title="Initialized state",
+            )
 
-    def action_save_state(self) -> None:
-        # TODO: ask user where to save, if no state file was given
-        self.state.to_json_file(self.state_file)
+    async def reset_state(self, state: FinancialState) -> None:
+        """Replace the loaded state with the given one, discarding unsaved changes.
+
+        Any screen open on top of the main screen is closed, and the main screen is
+        recreated to show the new state. Saves still in progress are waited for,
+        so that they can't mark the new state as saved.
+        """
+        await self._wait_for_saves()
+        while len(self.screen_stack) > 2:
+            self.pop_screen()
+        self.state = state
+        self.state_loaded = True
+        self._change_count = 0
         self.mark_changes_saved()
+        await self.switch_screen(MainScreen(self.state))
+
+    def action_save_state(self) -> None:
+        if not self.state_loaded:
+            # don't overwrite the state file with the empty state
+            self.notify("The state is still loading", severity="warning")
+            return
+        if self.state_file is None:
+            # TODO: ask user where to save, if no state file was given
+            self.notify("No state file to save to", severity="warning")
+            return
+        self._save_state(self._change_count)
+
+    @work(thread=True, group="save")
+    def _save_state(self, change_count: int) -> None:
+        with self._save_lock:
+            self.state.to_json_file(self.state_file)
+        self.call_from_thread(self._on_state_saved, change_count)
+
+    async def _wait_for_saves(self) -> None:
+        """Wait for the writes of the state file in progress, if any."""
+        for worker in list(self.workers):
+            if worker.group == "save" and not worker.is_finished:
+                # a failed save leaves its changes unsaved, nothing to do here
+                with suppress(WorkerFailed):
+                    await worker.wait()
+
+    def _on_state_saved(self, change_count: int) -> None:
+        # changes made while the file was being written are still unsaved
+        if change_count == self._change_count:
+            self.mark_changes_saved()
         self.notify(
             f"Written file {os.path.basename(self.state_file)}", title="Saved state"
         )
@@ -708,6 +949,9 @@ class BudgetApp(App):
     @work
     async def action_quit(self) -> None:
         """Override quit action to check for unsaved changes."""
+        # a save still in progress may be saving the changes, and quitting
+        # before it's done could cut it short
+        await self._wait_for_saves()
         if self.has_unsaved_changes:
             screen = ConfirmationModal(
                 "You have unsaved changes. Are you sure you want to quit?"
@@ -1,11 +1,14 @@
+import calendar
 import enum
-from collections import defaultdict
+import os
+from contextlib import suppress
 from datetime import date
 from decimal import Decimal
-from typing import NamedTuple
+from functools import cached_property, lru_cache
+from itertools import chain
+from typing import Callable, Iterable, NamedTuple
 
-from dateutil.relativedelta import relativedelta
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class CurrencyFormat(NamedTuple):
@@ -28,53 +31,57 @@ CURRENCY_FORMATS = {
 }
 
 
+def _build_formatter(fmt: CurrencyFormat) -> Callable[[Decimal], str]:
+    """Build a function formatting amounts in the given currency."""
+    symbol = fmt.symbol
+    quantum = Decimal(1).scaleb(-fmt.decimal_places)
+    # the "," format spec uses "," and "." as separators, swap in the currency's
+    separators = str.maketrans(
+        {",": fmt.thousands_separator, ".": fmt.decimal_separator}
+    )
+
+    def formatter(amount: Decimal) -> str:
+        return symbol + f"{amount.quantize(quantum):,f}".translate(separators)
+
+    return formatter
+
+
+_FORMATTERS = {code: _build_formatter(fmt) for code, fmt in CURRENCY_FORMATS.items()}
+
+
 def format_currency(amount: Decimal, currency_code: str) -> str:
     """Format a decimal amount with the appropriate currency symbol and formatting."""
-    fmt = CURRENCY_FORMATS[currency_code]
+    if not amount and amount.is_signed():
+        # -0 is equal to 0 as a cache key, but formats with a sign
+        return _FORMATTERS[currency_code](amount)
+    return _format_currency(amount, currency_code)
 
-    # Round to appropriate decimal places
-    if fmt.decimal_places == 0:
-        amount = amount.quantize(Decimal("1"))
-    else:
-        amount = amount.quantize(Decimal("0.01"))
 
-    # Convert to string and split into integer and decimal parts
-    amount_str = str(amount)
-    if "." in amount_str:
-        integer_part, decimal_part = amount_str.split(".")
-    else:
-        integer_part, decimal_part = amount_str, ""
-
-    # Handle negative sign
-    negative_sign = ""
-    if integer_part.startswith("-"):
-        negative_sign = "-"
-        integer_part = integer_part[1:]
-
-    # Add thousands separators
-    if len(integer_part) > 3:
-        # Add thousands separator from right to left
-        formatted_integer = ""
-        for i, digit in enumerate(reversed(integer_part)):
-            if i > 0 and i % 3 == 0:
-                formatted_integer = fmt.thousands_separator + formatted_integer
-            formatted_integer = digit + formatted_integer
-        integer_part = formatted_integer
-
-    # Construct final formatted string
-    if fmt.decimal_places > 0 and decimal_part:
-        # Pad decimal part to required length
-        decimal_part = decimal_part.ljust(fmt.decimal_places, "0")
-        formatted_amount = (
-            f"{negative_sign}{integer_part}{fmt.decimal_separator}{decimal_part}"
-        )
-    elif fmt.decimal_places > 0:
-        # Add decimal separator with zeros
-        formatted_amount = f"{negative_sign}{integer_part}{fmt.decimal_separator}{'0' * fmt.decimal_places}"
-    else:
-        formatted_amount = f"{negative_sign}{integer_part}"
+# Memoized, as tables format the same amounts of recurring entries over and over
+@lru_cache(maxsize=4096)
+def _format_currency(amount: Decimal, currency_code: str) -> str:
+    return _FORMATTERS[currency_code](amount)
+
+
+_ZERO = Decimal(0)
+
 
-    return f"{fmt.symbol}{formatted_amount}"
+def decimal_places(amount: Decimal) -> int:
+    """The number of digits of an amount after the decimal point."""
+    return max(-amount.as_tuple().exponent, 0)
+
+
+def add_months(day: date, months: list[int]) -> list[date]:
+    """Shift a date by each of the given number of months, clamping the day to
+    the end of shorter months (e.g. Jan 31st + 1 month is Feb 28th/29th)."""
+    month_index = day.year * 12 + day.month - 1
+    result = []
+    for offset in months:
+        year, month = divmod(month_index + offset, 12)
+        month += 1
+        last_day = calendar.monthrange(year, month)[1]
+        result.append(date(year, month, min(day.day, last_day)))
+    return result
 
 
 def to_ordinal(n: int) -> str:
@@ -92,6 +99,9 @@ class RecurrenceType(enum.StrEnum):
 
 
 class Recurrence(BaseModel):
+    # frozen, so that it's hashable, like the (frozen) entries holding it
+    model_config = ConfigDict(frozen=True)
+
     start_date: date
     type: RecurrenceType
     every: int = 1
@@ -116,17 +126,42 @@ class Recurrence(BaseModel):
             return self.start_date.month == month_date.month
         raise ValueError(f"Invalid recurrence type: {self.type}")
 
+    @property
+    def month_mask(self) -> int:
+        """Bit mask of the calendar months this may occur on, bit 0 being January.
+
+        A clear bit means it never occurs on that month, whatever the year.
+        """
+        return _month_mask(self.type, self.every, self.start_date.month)
+
     @property
     def description(self) -> str:
-        if self.type == RecurrenceType.ONE_TIME:
-            return f"Once on {self.start_date}"
-        elif self.type == RecurrenceType.MONTHLY and self.every == 1:
-            return f"Monthly on the {to_ordinal(self.start_date.day)}"
-        elif self.type == RecurrenceType.MONTHLY:
-            return f"Every {self.every} months on the {to_ordinal(self.start_date.day)}"
-        elif self.type == RecurrenceType.ANNUAL:
-            return f"Annually on the {to_ordinal(self.start_date.day)} of {self.start_date.strftime('%B')}"
-        raise ValueError(f"Invalid recurrence type: {self.type}")
+        return _recurrence_description(self.type, self.every, self.start_date)
+
+
+@lru_cache(maxsize=256)
+def _month_mask(recurrence_type: RecurrenceType, every: int, start_month: int) -> int:
+    if recurrence_type == RecurrenceType.MONTHLY:
+        months = [m for m in range(1, 13) if m % every == start_month % every]
+    else:
+        months = [start_month]
+    return sum(1 << (m - 1) for m in months)
+
+
+@lru_cache(maxsize=256)
+def _recurrence_description(
+    recurrence_type: RecurrenceType, every: int, start_date: date
+) -> str:
+    """Describe a recurrence, shared between recurrences with the same pattern."""
+    if recurrence_type == RecurrenceType.ONE_TIME:
+        return f"Once on {start_date}"
+    elif recurrence_type == RecurrenceType.MONTHLY and every == 1:
+        return f"Monthly on the {to_ordinal(start_date.day)}"
+    elif recurrence_type == RecurrenceType.MONTHLY:
+        return f"Every {every} months on the {to_ordinal(start_date.day)}"
+    elif recurrence_type == RecurrenceType.ANNUAL:
+        return f"Annually on the {to_ordinal(start_date.day)} of {start_date.strftime('%B')}"
+    raise ValueError(f"Invalid recurrence type: {recurrence_type}")
 
 
 class EntryType(enum.StrEnum):
@@ -135,7 +170,11 @@ class EntryType(enum.StrEnum):
 
 
 class FinancialEntry(BaseModel):
-    amount: Decimal = Decimal(0)
+    # frozen, as entries are replaced rather than changed (see replace_entry),
+    # which keeps what's cached from them valid, and so that they're hashable
+    model_config = ConfigDict(frozen=True)
+
+    amount: Decimal = _ZERO
     description: str = ""
     type: EntryType = EntryType.EXPENSE
     recurrence: Recurrence = Field(
@@ -149,20 +188,141 @@ class FinancialEntry(BaseModel):
         return self.recurrence.will_occur_on_month(month)
 
 
+class EntryColumns(NamedTuple):
+    """The fields of a list of entries that forecasts need, as parallel tuples,
+    along with indexes of the entries that may occur on each month."""
+
+    # amounts as integers in units of 10 ** -scale, scale being the largest
+    # number of decimal places of the amounts (at least 2, for cents), so that
+    # they're summed exactly
+    amounts: tuple[int, ...]
+    scale: int
+    # categories are numbered in order of first appearance, see category_names
+    category_ids: tuple[int, ...]
+    # where the monthly entries start and end, see occurring_on
+    start_years: tuple[int, ...]
+    start_months: tuple[int, ...]
+    end_dates: tuple[date | None, ...]
+    category_names: tuple[str, ...]
+    # annual entries, by calendar month (0 being January): they always occur
+    annual_by_month: tuple[tuple[int, ...], ...]
+    # one-time entries, by year * 12 + calendar month: they always occur
+    one_time_by_month: dict[int, tuple[int, ...]]
+    # monthly entries, by calendar month: they may occur, depending on the year
+    monthly_by_month: tuple[tuple[int, ...], ...]
+
+    @classmethod
+    def from_entries(cls, entries: list[FinancialEntry]) -> "EntryColumns":
+        category_ids: dict[str, int] = {}
+        annual_by_month: list[list[int]] = [[] for _ in range(12)]
+        one_time_by_month: dict[int, list[int]] = {}
+        monthly_by_month: list[list[int]] = [[] for _ in range(12)]
+        for i, entry in enumerate(entries):
+            category_ids.setdefault(entry.category, len(category_ids))
+            recurrence = entry.recurrence
+            start_date = recurrence.start_date
+            if recurrence.type == RecurrenceType.ONE_TIME:
+                month_index = start_date.year * 12 + start_date.month - 1
+                one_time_by_month.setdefault(month_index, []).append(i)
+            else:
+                by_month = (
+                    annual_by_month
+                    if recurrence.type == RecurrenceType.ANNUAL
+                    else monthly_by_month
+                )
+                month_mask = recurrence.month_mask
+                for month in range(12):
+                    if month_mask & (1 << month):
+                        by_month[month].append(i)
+
+        amounts = [entry.amount for entry in entries]
+        scale = max(2, max(map(decimal_places, amounts), default=0))
+        return cls(
+            tuple(int(amount.scaleb(scale)) for amount in amounts),
+            scale,
+            tuple(category_ids[entry.category] for entry in entries),
+            tuple(entry.recurrence.start_date.year for entry in entries),
+            tuple(entry.recurrence.start_date.month for entry in entries),
+            tuple(entry.recurrence.end_date for entry in entries),
+            tuple(category_ids),
+            tuple(map(tuple, annual_by_month)),
+            {key: tuple(value) for key, value in one_time_by_month.items()},
+            tuple(map(tuple, monthly_by_month)),
+        )
+
+    def occurring_on(self, month: date) -> Iterable[int]:
+        """Indexes of the entries occurring on the given month, in no particular
+        order."""
+        year = month.year
+        calendar_month = month.month - 1
+        start_years = self.start_years
+        start_months = self.start_months
+        end_dates = self.end_dates
+        # only the monthly entries need checking against the full date: their
+        # index already matched the month against `every`, what's left of
+        # Recurrence.will_occur_on_month are its start and end date checks
+        return chain(
+            self.annual_by_month[calendar_month],
+            self.one_time_by_month.get(year * 12 + calendar_month, ()),
+            [
+                i
+                for i in self.monthly_by_month[calendar_month]
+                if not (end_dates[i] and month > end_dates[i])
+                and not (year <= start_years[i] and month.month < start_months[i])
+            ],
+        )
+
+    def sum_by_category(self, month: date) -> dict[str, Decimal]:
+        """Sum the amounts of the entries occurring on the given month."""
+        return self.sums_by_category([month])[0]
+
+    def sums_by_category(self, months: list[date]) -> list[dict[str, Decimal]]:
+        """Sum the amounts of the entries occurring on each of the given months."""
+        amounts = self.amounts
+        scale = self.scale
+        category_ids = self.category_ids
+        category_names = self.category_names
+        num_categories = len(category_names)
+        result = []
+        for month in months:
+            occurring = self.occurring_on(month)
+            # sum the int amounts in a list indexed by category id, converting
+            # to Decimal once per category
+            totals = [0] * num_categories
+            occurred = [False] * num_categories
+            for i in occurring:
+                category_id = category_ids[i]
+                totals[category_id] += amounts[i]
+                occurred[category_id] = True
+            result.append(
+                {
+                    category_names[category_id]: Decimal(totals[category_id]).scaleb(
+                        -scale
+                    )
+                    for category_id in range(num_categories)
+                    if occurred[category_id]
+                }
+            )
+        return result
+
+
 class MonthlyForecast(BaseModel):
+    # frozen, as the totals below are computed only once
+    model_config = ConfigDict(frozen=True)
+
     month: date
     expenses_by_category: dict[str, Decimal]
     income_by_category: dict[str, Decimal]
 
-    @property
+    @cached_property
     def total_income(self) -> Decimal:
-        return Decimal(sum(self.income_by_category.values()))
+        return sum(self.income_by_category.values(), _ZERO)
 
-    @property
+    @cached_property
     def total_expenses(self) -> Decimal:
-        return Decimal(sum(self.expenses_by_category.values()))
+        return sum(self.expenses_by_category.values(), _ZERO)
 
-    @property
+    @cached_property
     def balance(self) -> Decimal:
         return self.total_income - self.total_expenses
 
@@ -173,37 +333,38 @@ class MonthlyForecast(BaseModel):
         income_entries: list[FinancialEntry],
         expenses_entries: list[FinancialEntry],
     ) -> "MonthlyForecast":
-        def _build_forecast_by_category_for_month(
-            entries: list[FinancialEntry],
-        ) -> dict:
-            forecast = defaultdict(Decimal)
-            for entry in entries:
-                if entry.will_occur_on_month(month):
-                    forecast[entry.category] += entry.amount
-            return forecast
+        return cls.from_entry_columns(
+            month,
+            EntryColumns.from_entries(income_entries),
+            EntryColumns.from_entries(expenses_entries),
+        )
 
+    @classmethod
+    def from_entry_columns(
+        cls, month: date, income_columns: EntryColumns, expense_columns: EntryColumns
+    ) -> "MonthlyForecast":
         return cls(
             month=month,
-            expenses_by_category=_build_forecast_by_category_for_month(
-                expenses_entries
-            ),
-            income_by_category=_build_forecast_by_category_for_month(income_entries),
+            expenses_by_category=expense_columns.sum_by_category(month),
+            income_by_category=income_columns.sum_by_category(month),
         )
 
 
 class FinancialState(BaseModel):
-    all_entries: dict[EntryType, list[FinancialEntry]] = {
-        EntryType.INCOME: [],
-        EntryType.EXPENSE: [],
+    # tuples, so that the entries can only be changed through the methods
+    # below, which keep the caches in sync
+    all_entries: dict[EntryType, tuple[FinancialEntry, ...]] = {
+        EntryType.INCOME: (),
+        EntryType.EXPENSE: (),
     }
     currency_code: str = "EUR"
 
     @property
-    def income_entries(self) -> list[FinancialEntry]:
+    def income_entries(self) -> tuple[FinancialEntry, ...]:
         return self.all_entries[EntryType.INCOME]
 
     @property
-    def expense_entries(self) -> list[FinancialEntry]:
+    def expense_entries(self) -> tuple[FinancialEntry, ...]:
         return self.all_entries[EntryType.EXPENSE]
 
     @property
@@ -213,41 +374,100 @@ class FinancialState(BaseModel):
             EntryType.EXPENSE: {entry.category for entry in self.expense_entries},
         }
 
+    @cached_property
+    def _cached_entries(self) -> dict[EntryType, tuple[FinancialEntry, ...]]:
+        # the entries the caches below were derived from
+        return dict(self.all_entries)
+
+    @cached_property
+    def _entry_columns(self) -> dict[EntryType, EntryColumns]:
+        return {
+            entry_type: EntryColumns.from_entries(entries)
+            for entry_type, entries in self._cached_entries.items()
+        }
+
+    @cached_property
+    def _forecast_cache(self) -> dict[date, MonthlyForecast]:
+        return {}
+
+    def _entries_changed(self) -> None:
+        self.__dict__.pop("_cached_entries", None)
+        self.__dict__.pop("_entry_columns", None)
+        self.__dict__.pop("_forecast_cache", None)
+
+    def _check_cached_entries(self) -> None:
+        # the entry tuples can't be changed in place, but they can still be
+        # swapped in all_entries directly, so drop the caches if they were.
+        # Comparing unchanged tuples is cheap, as they're the same objects
+        if self._cached_entries != self.all_entries:
+            self._entries_changed()
+
     def add_entry(self, entry: FinancialEntry):
-        self.all_entries[entry.type].append(entry)
+        self.add_entries([entry])
+
+    def add_entries(self, entries: Iterable[FinancialEntry]):
+        added: dict[EntryType, list[FinancialEntry]] = {}
+        for entry in entries:
+            added.setdefault(entry.type, []).append(entry)
+        for entry_type, type_entries in added.items():
+            self.all_entries[entry_type] += tuple(type_entries)
+        self._entries_changed()
 
     def remove_entry(self, entry: FinancialEntry):
-        self.all_entries[entry.type].remove(entry)
+        type_entries = self.all_entries[entry.type]
+        index = type_entries.index(entry)
+        self.all_entries[entry.type] = type_entries[:index] + type_entries[index + 1 :]
+        self._entries_changed()
+
+    def replace_entry(self, index: int, entry: FinancialEntry):
+        """Replace the entry at index, among the entries of the same type."""
+        type_entries = list(self.all_entries[entry.type])
+        type_entries[index] = entry
+        self.all_entries[entry.type] = tuple(type_entries)
+        self._entries_changed()
 
     def get_monthly_forecast(self, month: date) -> MonthlyForecast:
-        return MonthlyForecast.from_financial_entries(
-            month, self.income_entries, self.expense_entries
-        )
+        return self._get_forecasts([month])[month]
 
     def get_forecast_for_next_n_months(self, n: int) -> dict[date, MonthlyForecast]:
         assert n > 0, "n must be a positive integer"
-        forecast: dict[date, MonthlyForecast] = {}
-        today = date.today()
-        for i in range(n):
-            month = today + relativedelta(months=i)
-            forecast[month] = self.get_monthly_forecast(month)
-        return forecast
+        return self._get_forecasts(add_months(date.today(), list(range(n))))
 
     def get_forecast_for_previous_n_months(self, n: int) -> dict[date, MonthlyForecast]:
         assert n > 0, "n must be a positive integer"
-        forecast: dict[date, MonthlyForecast] = {}
-        today = date.today()
-        for i in range(1, n + 1):
-            month = today - relativedelta(months=i)
-            forecast[month] = self.get_monthly_forecast(month)
-        return forecast
+        months = add_months(date.today(), [-i for i in range(1, n + 1)])
+        return self._get_forecasts(months)
+
+    def _get_forecasts(self, months: list[date]) -> dict[date, MonthlyForecast]:
+        self._check_cached_entries()
+        cache = self._forecast_cache
+        missing = [month for month in months if month not in cache]
+        if missing:
+            # compute the missing months together
+            columns = self._entry_columns
+            income = columns[EntryType.INCOME].sums_by_category(missing)
+            expenses = columns[EntryType.EXPENSE].sums_by_category(missing)
+            for month, income_by_category, expenses_by_category in zip(
+                missing, income, expenses
+            ):
+                # built from already validated entries, so skip re-validating
+                cache[month] = MonthlyForecast.model_construct(
+                    month=month,
+                    expenses_by_category=expenses_by_category,
+                    income_by_category=income_by_category,
+                )
+        return {month: cache[month] for month in months}
 
     def get_entries_for_month(self, month: date) -> list[FinancialEntry]:
         """Get all individual financial entries that occur in a specific month."""
+        self._check_cached_entries()
         entries = []
-        for entry in self.income_entries + self.expense_entries:
-            if entry.will_occur_on_month(month):
-                entries.append(entry)
+        # only look at the entries that may occur on that month, keeping them in
+        # the order they were added
+        for entry_type in (EntryType.INCOME, EntryType.EXPENSE):
+            type_entries = self._cached_entries[entry_type]
+            occurring = self._entry_columns[entry_type].occurring_on(month)
+            entries.extend(type_entries[i] for i in sorted(occurring))
         return entries
 
     @classmethod
@@ -256,9 +476,31 @@ class FinancialState(BaseModel):
             return cls.model_validate_json(file.read())
 
     def to_json_file(self, file_path: str):
-        import os
-
-        with open(file_path, "w") as file:
-            file.write(self.model_dump_json(indent=2))
-        # Set file permissions to be readable/writable by owner only
-        os.chmod(file_path, 0o600)
+        # Write to a temporary file and move it over the state file, so that a
+        # crash in the middle of the write doesn't leave a truncated file behind.
+        # A symlinked state file is written through, like open() would, rather
+        # than being replaced by a regular file
+        file_path = os.path.realpath(file_path)
+        tmp_path = f"{file_path}.tmp"
+        # A temporary file left behind by a crash keeps its permissions (and
+        # could be a symlink), so remove it and create a new file, readable and
+        # writable by owner only, before anything is written to it
+        with suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            with os.fdopen(fd, "w") as file:
+                file.write(self.model_dump_json(indent=2))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            with suppress(FileNotFoundError):
+                os.unlink(tmp_path)
+            raise
+        # and make the rename itself durable
+        dir_fd = os.open(os.path.dirname(file_path), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
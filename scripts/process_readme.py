@@ -5,6 +5,12 @@ import re
 import sys
 from pathlib import Path
 
+# Matches linked images: [![alt](./path)](./path) and simple images: ![alt](./path)
+# The linked form comes first, so that its inner image isn't matched on its own
+IMAGE_URL_PATTERN = re.compile(
+    r"\[!\[([^\]]*)\]\(\./([^)]+)\)\]\(\./([^)]+)\)|!\[([^\]]*)\]\(\./([^)]+)\)"
+)
+
 
 def process_readme(tag_version: str) -> None:
     """Convert local image URLs to GitHub URLs in README.md.
@@ -14,31 +20,30 @@ def process_readme(tag_version: str) -> None:
     """
     readme_path = Path("README.md")
 
-    if not readme_path.exists():
+    try:
+        content = readme_path.read_text()
+    except FileNotFoundError:
         print(f"Error: {readme_path} not found", file=sys.stderr)
         sys.exit(1)
 
-    content = readme_path.read_text()
-
     # GitHub repository base URL for raw files at specific tag
     github_base = (
         f"https://raw.githubusercontent.com/eliasdorneles/moomoolah/v{tag_version}"
     )
 
-    # Replace linked images: [![alt](./path)](./path)
-    content = re.sub(
-        r"\[\!\[([^\]]*)\]\(\./([^)]+)\)\]\(\./([^)]+)\)",
-        rf"[!\[\1]({github_base}/\2)]({github_base}/\3)",
-        content,
-    )
+    def replace_image_url(match: re.Match) -> str:
+        alt, image_path, link_path, simple_alt, simple_image_path = match.groups()
+        if image_path is not None:
+            return f"[![{alt}]({github_base}/{image_path})]({github_base}/{link_path})"
+        return f"![{simple_alt}]({github_base}/{simple_image_path})"
 
-    # Replace simple images: ![alt](./path)
-    content = re.sub(
-        r"\!\[([^\]]*)\]\(\./([^)]+)\)", rf"![\1]({github_base}/\2)", content
-    )
+    content = IMAGE_URL_PATTERN.sub(replace_image_url, content)
 
-    # Write the processed content back
-    readme_path.write_text(content)
+    # Write the processed content back, through a temporary file so that an
+    # interrupted run can't leave a truncated README behind
+    tmp_path = readme_path.with_name(f"{readme_path.name}.tmp")
+    tmp_path.write_text(content)
+    tmp_path.replace(readme_path)
     print(f"Processed README.md with GitHub URLs for tag v{tag_version}")
 
 
@@ -35,7 +35,8 @@ async def create_main_screen_screenshot():
     try:
         app = BudgetApp(state_file=str(demo_state_path))
         async with app.run_test(size=(120, 50)) as pilot:
-            # Wait for the app to fully initialize
+            # Wait for the app to load the state and fully initialize
+            await app.workers.wait_for_complete()
             await pilot.pause()
 
             # Take screenshot of the main screen
@@ -68,7 +69,8 @@ async def create_add_expense_screenshot():
     try:
         app = BudgetApp(state_file=str(demo_state_path))
         async with app.run_test(size=(120, 50)) as pilot:
-            # Wait for the app to fully initialize
+            # Wait for the app to load the state and fully initialize
+            await app.workers.wait_for_complete()
             await pilot.pause()
 
             # Press Insert to add entry from main screen
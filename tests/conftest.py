@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+from moomoolah.state import FinancialState
+
+try:
+    import uvloop
+except ImportError:  # not available on Windows
+    uvloop = None
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """Run the async tests on uvloop, when it's installed."""
+    if uvloop is None:
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()
+
+
+# the same for every test, so it's only serialized once
+_EMPTY_STATE_JSON = FinancialState().model_dump_json(indent=2)
+
+
+@pytest.fixture
+def empty_state_file(tmp_path):
+    """Path to a state file without any entries, in the test's tmp_path."""
+    state_file = tmp_path / "state.json"
+    state_file.write_text(_EMPTY_STATE_JSON)
+    return str(state_file)
@@ -1,11 +1,21 @@
-import tempfile
 from datetime import date
 from decimal import Decimal
+from functools import lru_cache
+from unittest.mock import MagicMock
 
 import pytest
-from textual.widgets import DataTable, Label
-
-from moomoolah.budget_app import BudgetApp, MainScreen
+from textual.coordinate import Coordinate
+from textual.widgets import DataTable, Input, Label
+
+from moomoolah.budget_app import (
+    BudgetApp,
+    EntryTypeModal,
+    MainScreen,
+    ManageEntriesScreen,
+    MonthDetailModal,
+    UpdateEntryModal,
+    _amount_text,
+)
 from moomoolah.state import (
     EntryType,
     FinancialEntry,
@@ -14,426 +24,424 @@ from moomoolah.state import (
     RecurrenceType,
     CURRENCY_FORMATS,
 )
+from moomoolah.widgets import ConfirmationModal
 
 
-def parse_currency_from_text(text: str, currency_code: str) -> Decimal:
-    """Parse currency value from text by removing the currency symbol and thousands separators."""
-    currency_format = CURRENCY_FORMATS[currency_code]
-    # Remove currency symbol
-    numeric_text = text.replace(currency_format.symbol, "")
-    # Remove thousands separators
-    numeric_text = numeric_text.replace(currency_format.thousands_separator, "")
-    # Handle decimal separator - convert to period if needed
-    if currency_format.decimal_separator != ".":
-        numeric_text = numeric_text.replace(currency_format.decimal_separator, ".")
-    return Decimal(numeric_text)
-
-
-@pytest.fixture
-def basic_temp_state_file():
-    """Create a basic temporary state file for testing."""
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-        # Create a basic state with some test data
-        state = FinancialState()
-        state.add_entry(
-            FinancialEntry(
-                amount=Decimal("1000"),
-                description="Test Income",
-                type=EntryType.INCOME,
-                category="Income",
-                recurrence=Recurrence(
-                    type=RecurrenceType.MONTHLY,
-                    start_date=date(2024, 1, 1),
-                ),
-            )
-        )
-        state.to_json_file(f.name)
-        yield f.name
-
-
-class TestBudgetApp:
-    """Test the main BudgetApp functionality."""
-
-    @pytest.fixture
-    def temp_state_file(self):
-        """Create a temporary state file for testing."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-            # Create a basic state with some test data
-            state = FinancialState()
-            state.add_entry(
-                FinancialEntry(
-                    amount=Decimal("2000"),
-                    description="Test Salary",
-                    type=EntryType.INCOME,
-                    category="Income",
-                    recurrence=Recurrence(
-                        type=RecurrenceType.MONTHLY,
-                        start_date=date(2024, 1, 1),
-                    ),
-                )
-            )
-            state.add_entry(
-                FinancialEntry(
-                    amount=Decimal("800"),
-                    description="Test Rent",
-                    type=EntryType.EXPENSE,
-                    category="Housing",
-                    recurrence=Recurrence(
-                        type=RecurrenceType.MONTHLY,
-                        start_date=date(2024, 1, 1),
-                    ),
-                )
-            )
-            state.to_json_file(f.name)
-            yield f.name
-
-    async def test_app_initialization(self, temp_state_file):
-        """Test that the app initializes correctly with a state file."""
-        app = BudgetApp(state_file=temp_state_file)
-        async with app.run_test() as pilot:
-            await pilot.pause()  # Wait for the app to fully initialize
-            # Check that the main screen is loaded
-            assert isinstance(app.screen, MainScreen)
-            # Check that forecast table is present
-            forecast_table = app.screen.query_one("#forecast_table", DataTable)
-            assert forecast_table is not None
-
-    async def test_forecast_table_displays_data(self, temp_state_file):
-        """Test that the forecast table displays financial data correctly."""
-        app = BudgetApp(state_file=temp_state_file)
-        async with app.run_test() as pilot:
-            await pilot.pause()
-            forecast_table = app.screen.query_one("#forecast_table", DataTable)
+def _balance_at(forecast_table: DataTable, row: int = 0) -> str:
+    """Return the text of the balance column of a forecast table row."""
+    return forecast_table.get_cell_at(Coordinate(row, 3)).plain
 
-            # Should have at least one row of data
-            assert forecast_table.row_count > 0
 
-            # Check that columns are set up correctly
-            assert len(forecast_table.columns) == 4
-            column_labels = [col.label.plain for col in forecast_table.columns.values()]
-            assert column_labels == ["Month", "Expenses", "Income", "Balance"]
+@lru_cache(maxsize=8)
+def _currency_translation(currency_code: str) -> tuple[str, dict[int, str | None]]:
+    """Return the currency symbol and a table to normalize the rest of the amount."""
+    currency_format = CURRENCY_FORMATS[currency_code]
+    # Remove thousands separators and convert the decimal separator to a period
+    table = str.maketrans(
+        {
+            currency_format.thousands_separator: None,
+            currency_format.decimal_separator: ".",
+        }
+    )
+    return currency_format.symbol, table
 
-    async def test_navigation_to_manage_expenses(self, temp_state_file):
-        """Test navigation to expense management screen using keyboard shortcut."""
-        app = BudgetApp(state_file=temp_state_file)
-        async with app.run_test() as pilot:
-            # Press 'e' key to navigate to expenses
-            await pilot.press("e")
-            await pilot.pause()
 
-            # Should be on ManageEntriesScreen now
-            assert app.screen.__class__.__name__ == "ManageEntriesScreen"
-            assert app.screen.sub_title == "Managing Expenses"
+def parse_currency_from_text(text: str, currency_code: str) -> Decimal:
+    """Parse currency value from text by removing the currency symbol and thousands separators."""
+    symbol, table = _currency_translation(currency_code)
+    return Decimal(text.replace(symbol, "").translate(table))
+
+
+def _monthly_entry(
+    description: str,
+    amount: str,
+    entry_type: EntryType,
+    category: str,
+    start_date: date = date(2024, 1, 1),
+) -> FinancialEntry:
+    return FinancialEntry(
+        amount=Decimal(amount),
+        description=description,
+        type=entry_type,
+        category=category,
+        recurrence=Recurrence(type=RecurrenceType.MONTHLY, start_date=start_date),
+    )
+
+
+async def _fill_entry_form(pilot, app, **fields: str) -> None:
+    """Fill in the entry form fields, given by name without the "entry_" prefix.
+
+    Inputs accept their value without being focused, so there's no need to click
+    them first. Unless given, the entry starts on 2024-01-01 and repeats every month.
+    """
+    fields = {"start_date": "2024-01-01", "every": "1", **fields}
+    screen = app.screen
+    for name, value in fields.items():
+        screen.query_one(f"#entry_{name}", Input).value = value
+    await pilot.pause(0)
+
+
+def _two_entry_state() -> FinancialState:
+    state = FinancialState()
+    state.add_entries(
+        [
+            _monthly_entry("Test Salary", "2000", EntryType.INCOME, "Income"),
+            _monthly_entry("Test Rent", "800", EntryType.EXPENSE, "Housing"),
+        ]
+    )
+    return state
 
-    async def test_navigation_to_manage_income(self, temp_state_file):
-        """Test navigation to income management screen using keyboard shortcut."""
-        app = BudgetApp(state_file=temp_state_file)
-        async with app.run_test() as pilot:
-            # Press 'i' key to navigate to income
-            await pilot.press("i")
-            await pilot.pause()
 
-            # Should be on ManageEntriesScreen now
-            assert app.screen.__class__.__name__ == "ManageEntriesScreen"
-            assert app.screen.sub_title == "Managing Income"
+# Ways of changing the entries from the UI, each taking the app and its pilot on
+# the main screen of a state with a single expense.
 
-    async def test_save_state_action(self, temp_state_file):
-        """Test that Ctrl+S saves the state."""
-        app = BudgetApp(state_file=temp_state_file)
-        async with app.run_test() as pilot:
-            # Trigger save action
-            await pilot.press("ctrl+s")
-            await pilot.pause()
 
-            # Check that notification was displayed (implicit test via no exception)
-            # The actual file saving is tested in state tests
+async def _add_expense(app, pilot) -> None:
+    await pilot.press("insert")
+    await pilot.click("#add_expense")
+    # Dismiss the entry form with an entry, as saving it does, without filling it
+    # in: that's covered by test_forecast_updates_after_adding_entry
+    await app.screen.dismiss(
+        _monthly_entry("Test Expense", "100", EntryType.EXPENSE, "Test")
+    )
+    await pilot.pause(0)
 
-    async def test_forecast_updates_after_adding_expense(self, temp_state_file):
-        """Test that the main screen forecast updates after adding an expense."""
-        app = BudgetApp(state_file=temp_state_file)
-        async with app.run_test(size=(120, 50)) as pilot:
-            await pilot.pause()
 
-            # Get initial forecast data
-            forecast_table = app.screen.query_one("#forecast_table", DataTable)
+async def _modify_first_expense(app, pilot) -> None:
+    await pilot.press("e")
+    await pilot.click("#entries_table")
+    await pilot.press("enter")
+    app.screen.query_one("#entry_description", Input).value = "Modified Entry"
+    await pilot.click("#entry_save")
 
-            # Get first month's balance from the forecast table
-            first_row_cells = list(forecast_table.get_row_at(0))
-            initial_balance_text = first_row_cells[3].plain  # Balance column
-            initial_balance = parse_currency_from_text(
-                initial_balance_text, app.state.currency_code
-            )
 
-            # Navigate to expense management
-            await pilot.press("e")
-            await pilot.pause()
+async def _delete_first_expense(app, pilot) -> None:
+    await pilot.press("e")
+    await pilot.press("delete")
+    await pilot.click("#confirmation_yes")
 
-            # Add a new expense
-            await pilot.press("insert")  # Trigger add entry action
-            await pilot.pause()
 
-            # Fill in the expense form
-            description_input = app.screen.query_one("#entry_description")
-            await pilot.click("#entry_description")
-            description_input.value = "Test Expense"
+# The states below are handed to the app in memory, so the tests don't go through
+# a state file unless they're about saving it.
 
-            amount_input = app.screen.query_one("#entry_amount")
-            await pilot.click("#entry_amount")
-            amount_input.value = "300"
 
-            category_input = app.screen.query_one("#entry_category")
-            await pilot.click("#entry_category")
-            category_input.value = "Test Category"
-
-            # Set start date (required field)
-            start_date_input = app.screen.query_one("#entry_start_date")
-            await pilot.click("#entry_start_date")
-            start_date_input.value = "2024-01-01"
+@pytest.fixture
+def empty_state():
+    """State without any entries."""
+    return FinancialState()
 
-            # Set every field (required)
-            every_input = app.screen.query_one("#entry_every")
-            await pilot.click("#entry_every")
-            every_input.value = "1"
 
-            # Save the entry
-            await pilot.click("#entry_save")
-            await pilot.pause()
+@pytest.fixture
+def basic_state():
+    """State with a single monthly income."""
+    state = FinancialState()
+    state.add_entry(_monthly_entry("Test Income", "1000", EntryType.INCOME, "Income"))
+    return state
 
-            # Check that we're back on ManageEntriesScreen after saving
-            assert app.screen.__class__.__name__ == "ManageEntriesScreen"
 
-            # Navigate back to main screen
-            await pilot.press("escape")
-            await pilot.pause()
-
-            # Verify we're back on main screen
-            assert isinstance(app.screen, MainScreen)
+@pytest.fixture
+def one_expense_state():
+    """State with a single monthly expense."""
+    state = FinancialState()
+    state.add_entry(_monthly_entry("Test Expense", "100", EntryType.EXPENSE, "Test"))
+    return state
 
-            # Check that the forecast table has been updated
-            updated_forecast_table = app.screen.query_one("#forecast_table", DataTable)
 
-            # Get the updated balance for the first month
-            updated_first_row_cells = list(updated_forecast_table.get_row_at(0))
-            updated_balance_text = updated_first_row_cells[3].plain  # Balance column
-            updated_balance = parse_currency_from_text(
-                updated_balance_text, app.state.currency_code
-            )
+@pytest.fixture
+def two_entry_state():
+    """State with a monthly salary and a monthly rent."""
+    return _two_entry_state()
 
-            # The balance should have decreased by 300 (the expense amount)
-            expected_balance = initial_balance - Decimal("300")
-            assert updated_balance == expected_balance, (
-                f"Expected balance {expected_balance}, got {updated_balance}"
-            )
 
-    async def test_add_entry_from_main_screen_expense(self, temp_state_file):
-        """Test adding an expense directly from main screen using Insert key."""
-        app = BudgetApp(state_file=temp_state_file)
-        async with app.run_test(size=(120, 50)) as pilot:
-            await pilot.pause()
+# With pytest-xdist every worker gets its own shared app, and the tests using it
+# leave it as they found it, so they can be distributed in any order.
+@pytest.fixture(scope="module")
+async def shared_app():
+    """Running app shared by the tests, to save starting an app for each of them."""
+    app = BudgetApp(state=_two_entry_state())
+    async with app.run_test(size=(120, 50)) as pilot:
+        yield app, pilot
 
-            # Get initial forecast data
-            forecast_table = app.screen.query_one("#forecast_table", DataTable)
-            first_row_cells = list(forecast_table.get_row_at(0))
-            initial_balance_text = first_row_cells[3].plain  # Balance column
-            initial_balance = parse_currency_from_text(
-                initial_balance_text, app.state.currency_code
-            )
 
-            # Press Insert to add entry from main screen
-            await pilot.press("insert")
-            await pilot.pause()
+@pytest.fixture
+async def read_only_app(shared_app):
+    """The shared app, brought back to its main screen after each test."""
+    app, pilot = shared_app
+    yield app, pilot
+    while len(app.screen_stack) > 2:
+        app.pop_screen()
+    await pilot.pause(0)
+    assert isinstance(app.screen, MainScreen)
 
-            # Should see entry type modal - click Expense
-            await pilot.click("#add_expense")
-            await pilot.pause()
 
-            # Should now see the entry form - fill it out
-            description_input = app.screen.query_one("#entry_description")
-            await pilot.click("#entry_description")
-            description_input.value = "Direct Expense"
+@pytest.fixture
+async def reset_app(shared_app):
+    """Function resetting the shared app to the given state, for tests modifying it.
 
-            amount_input = app.screen.query_one("#entry_amount")
-            await pilot.click("#entry_amount")
-            amount_input.value = "150"
+    The app is brought back to the state of the tests that don't modify it after
+    each test.
+    """
+    app, pilot = shared_app
 
-            category_input = app.screen.query_one("#entry_category")
-            await pilot.click("#entry_category")
-            category_input.value = "Test"
+    async def reset(state: FinancialState):
+        await app.reset_state(state)
+        return app, pilot
 
-            # Set required fields
-            start_date_input = app.screen.query_one("#entry_start_date")
-            await pilot.click("#entry_start_date")
-            start_date_input.value = "2024-01-01"
+    yield reset
+    await app.reset_state(_two_entry_state())
 
-            every_input = app.screen.query_one("#entry_every")
-            await pilot.click("#entry_every")
-            every_input.value = "1"
 
-            # Save the entry
-            await pilot.click("#entry_save")
-            await pilot.pause()
+class TestBudgetApp:
+    """Test the main BudgetApp functionality."""
 
-            # Should be back on main screen
+    def test_zero_amount_cell_after_negative_zero(self):
+        """Test that a zero amount isn't rendered as a negative zero seen before."""
+        assert _amount_text(Decimal("-0.00"), "USD").plain == "$-0.00"
+        assert _amount_text(Decimal("0.00"), "USD").plain == "$0.00"
+        assert _amount_text(Decimal("-0.00"), "USD").plain == "$-0.00"
+
+    async def test_app_initialization(self, read_only_app):
+        """Test that the app initializes correctly with a state."""
+        app, pilot = read_only_app
+        # Check that the main screen is loaded
+        assert isinstance(app.screen, MainScreen)
+        # Check that forecast table is present
+        forecast_table = app.screen.query_one("#forecast_table", DataTable)
+        assert forecast_table is not None
+
+    async def test_app_uses_given_in_memory_state(self):
+        """Test that the app can run on an in-memory state, without a state file."""
+        state = FinancialState()
+        state.add_entry(
+            _monthly_entry("Test Rent", "800", EntryType.EXPENSE, "Housing")
+        )
+        app = BudgetApp(state=state)
+        async with app.run_test() as pilot:
+            assert app.state is state
+            assert app.state_loaded
             assert isinstance(app.screen, MainScreen)
 
-            # Check that the forecast updated
-            updated_forecast_table = app.screen.query_one("#forecast_table", DataTable)
-            updated_first_row_cells = list(updated_forecast_table.get_row_at(0))
-            updated_balance_text = updated_first_row_cells[3].plain
-            updated_balance = parse_currency_from_text(
-                updated_balance_text, app.state.currency_code
-            )
-
-            # Balance should have decreased by 150
-            expected_balance = initial_balance - Decimal("150")
-            assert updated_balance == expected_balance, (
-                f"Expected balance {expected_balance}, got {updated_balance}"
-            )
-
-    async def test_add_entry_from_main_screen_income(self, temp_state_file):
-        """Test adding income directly from main screen using Insert key."""
-        app = BudgetApp(state_file=temp_state_file)
-        async with app.run_test(size=(120, 50)) as pilot:
-            await pilot.pause()
-
-            # Get initial forecast data
-            forecast_table = app.screen.query_one("#forecast_table", DataTable)
-            first_row_cells = list(forecast_table.get_row_at(0))
-            initial_balance_text = first_row_cells[3].plain
-            initial_balance = parse_currency_from_text(
-                initial_balance_text, app.state.currency_code
+            # there's no file to save the changes to, which the user is told
+            app.mark_unsaved_changes()
+            app.notify = MagicMock(wraps=app.notify)
+            await app.run_action("save_state")
+            await pilot.pause(0)
+            assert app.has_unsaved_changes
+            app.notify.assert_called_once_with(
+                "No state file to save to", severity="warning"
             )
 
-            # Press Insert to add entry from main screen
-            await pilot.press("insert")
-            await pilot.pause()
-
-            # Should see entry type modal - click Income
-            await pilot.click("#add_income")
-            await pilot.pause()
+    def test_app_requires_a_state_file_or_a_state(self):
+        """Test that the app can't be created without anything to load."""
+        with pytest.raises(ValueError):
+            BudgetApp()
+
+    async def test_reset_state_discards_changes(self, reset_app, basic_state):
+        """Test that resetting the state closes open screens and discards changes."""
+        app, pilot = await reset_app(FinancialState())
+        app.mark_unsaved_changes()
+        await pilot.press("e")
+
+        await app.reset_state(basic_state)
+        await pilot.pause(0)
+        assert app.state is basic_state
+        assert not app.has_unsaved_changes
+        assert app.title == "MooMoolah - Personal Budget Planner"
+        # nothing of the change tracking of the previous state is left
+        assert app._change_count == 0
+        assert isinstance(app.screen, MainScreen)
+        forecast_table = app.screen.query_one("#forecast_table", DataTable)
+        balance = parse_currency_from_text(
+            _balance_at(forecast_table), app.state.currency_code
+        )
+        assert balance == Decimal("1000")
 
-            # Fill out the income form
-            description_input = app.screen.query_one("#entry_description")
-            await pilot.click("#entry_description")
-            description_input.value = "Bonus"
+    async def test_forecast_table_displays_data(self, read_only_app):
+        """Test that the forecast table displays financial data correctly."""
+        app, pilot = read_only_app
+        forecast_table = app.screen.query_one("#forecast_table", DataTable)
 
-            amount_input = app.screen.query_one("#entry_amount")
-            await pilot.click("#entry_amount")
-            amount_input.value = "500"
+        # Should have at least one row of data
+        assert forecast_table.row_count > 0
 
-            category_input = app.screen.query_one("#entry_category")
-            await pilot.click("#entry_category")
-            category_input.value = "Extra"
+        # Check that columns are set up correctly
+        assert len(forecast_table.columns) == 4
+        column_labels = [col.label.plain for col in forecast_table.columns.values()]
+        assert column_labels == ["Month", "Expenses", "Income", "Balance"]
 
-            # Set required fields
-            start_date_input = app.screen.query_one("#entry_start_date")
-            await pilot.click("#entry_start_date")
-            start_date_input.value = "2024-01-01"
+    async def test_navigation_to_manage_expenses(self, read_only_app):
+        """Test navigation to expense management screen using keyboard shortcut."""
+        app, pilot = read_only_app
+        # Press 'e' key to navigate to expenses
+        await pilot.press("e")
+        await pilot.pause(0)
 
-            every_input = app.screen.query_one("#entry_every")
-            await pilot.click("#entry_every")
-            every_input.value = "1"
+        # Should be on ManageEntriesScreen now
+        assert app.screen.__class__.__name__ == "ManageEntriesScreen"
+        assert app.screen.sub_title == "Managing Expenses"
 
-            # Save the entry
-            await pilot.click("#entry_save")
-            await pilot.pause()
+    async def test_navigation_to_manage_income(self, read_only_app):
+        """Test navigation to income management screen using keyboard shortcut."""
+        app, pilot = read_only_app
+        # Press 'i' key to navigate to income
+        await pilot.press("i")
+        await pilot.pause(0)
 
-            # Should be back on main screen
-            assert isinstance(app.screen, MainScreen)
+        # Should be on ManageEntriesScreen now
+        assert app.screen.__class__.__name__ == "ManageEntriesScreen"
+        assert app.screen.sub_title == "Managing Income"
 
-            # Check that the forecast updated
-            updated_forecast_table = app.screen.query_one("#forecast_table", DataTable)
-            updated_first_row_cells = list(updated_forecast_table.get_row_at(0))
-            updated_balance_text = updated_first_row_cells[3].plain
-            updated_balance = parse_currency_from_text(
-                updated_balance_text, app.state.currency_code
+    async def test_save_state_action(self, two_entry_state, tmp_path):
+        """Test that Ctrl+S saves the state."""
+        state_file = tmp_path / "state.json"
+        two_entry_state.to_json_file(str(state_file))
+        app = BudgetApp(state_file=str(state_file))
+        async with app.run_test() as pilot:
+            await app.workers.wait_for_complete()
+            await pilot.pause(0)
+            app.state.add_entry(
+                _monthly_entry("Test Bonus", "300", EntryType.INCOME, "Extra")
             )
+            app.mark_unsaved_changes()
 
-            # Balance should have increased by 500
-            expected_balance = initial_balance + Decimal("500")
-            assert updated_balance == expected_balance, (
-                f"Expected balance {expected_balance}, got {updated_balance}"
-            )
+            # Trigger save action through its key binding
+            await pilot.press("ctrl+s")
+            await app.workers.wait_for_complete()
+            await pilot.pause(0)
+
+            assert not app.has_unsaved_changes
+            assert FinancialState.from_json_file(str(state_file)) == app.state
+            assert len(app.state.income_entries) == 2
+
+    async def test_quit_waits_for_save_in_progress(self, two_entry_state, tmp_path):
+        """Test that quitting right after saving waits for the save, without asking."""
+        state_file = tmp_path / "state.json"
+        two_entry_state.to_json_file(str(state_file))
+        app = BudgetApp(state_file=str(state_file))
+        async with app.run_test() as pilot:
+            await app.workers.wait_for_complete()
+            await pilot.pause(0)
+            app.state.currency_code = "BRL"
+            app.mark_unsaved_changes()
+
+            # hold up the save, as if the file took a while to write
+            with app._save_lock:
+                await pilot.press("ctrl+s", "ctrl+q")
+                await pilot.pause()
+                assert not isinstance(app.screen, ConfirmationModal)
+                assert app.return_code is None
+
+            await app.workers.wait_for_complete()
+            assert app.return_code == 0
+            assert FinancialState.from_json_file(str(state_file)).currency_code == "BRL"
+
+    @pytest.mark.parametrize(
+        "path,description,amount,category,sign",
+        [
+            ("manage_expense", "Test Expense", "300", "Test Category", -1),
+            ("main_insert_expense", "Direct Expense", "150", "Test", -1),
+            ("main_insert_income", "Bonus", "500", "Extra", +1),
+        ],
+    )
+    async def test_forecast_updates_after_adding_entry(
+        self, reset_app, two_entry_state, path, description, amount, category, sign
+    ):
+        """Test that the main screen forecast updates after adding an entry.
+
+        The entry is added either from the expense management screen or directly
+        from the main screen using the Insert key and the entry type modal.
+        """
+        app, pilot = await reset_app(two_entry_state)
+        # Get first month's balance from the forecast table
+        forecast_table = app.screen.query_one("#forecast_table", DataTable)
+        initial_balance_text = _balance_at(forecast_table)
+        initial_balance = parse_currency_from_text(
+            initial_balance_text, app.state.currency_code
+        )
 
-    async def test_add_entry_from_main_screen_cancel(self, temp_state_file):
-        """Test canceling the add entry flow from main screen."""
-        app = BudgetApp(state_file=temp_state_file)
-        async with app.run_test(size=(120, 50)) as pilot:
-            await pilot.pause()
+        # Open the entry form
+        match path:
+            case "manage_expense":
+                await pilot.press("e", "insert")
+                await pilot.pause(0)
+            case "main_insert_expense":
+                await pilot.press("insert")
+                await pilot.click("#add_expense")
+            case "main_insert_income":
+                await pilot.press("insert")
+                await pilot.click("#add_income")
 
-            # Get initial forecast data
-            forecast_table = app.screen.query_one("#forecast_table", DataTable)
-            first_row_cells = list(forecast_table.get_row_at(0))
-            initial_balance_text = first_row_cells[3].plain
-            initial_balance = parse_currency_from_text(
-                initial_balance_text, app.state.currency_code
-            )
+        await _fill_entry_form(
+            pilot, app, description=description, amount=amount, category=category
+        )
 
-            # Press Insert to add entry from main screen
-            await pilot.press("insert")
-            await pilot.pause()
+        # Save the entry
+        await pilot.click("#entry_save")
 
-            # Cancel the entry type modal
+        if path == "manage_expense":
+            # Saving returns to the ManageEntriesScreen, go back to main screen
+            assert app.screen.__class__.__name__ == "ManageEntriesScreen"
             await pilot.press("escape")
-            await pilot.pause()
+            await pilot.pause(0)
 
-            # Should be back on main screen with no changes
-            assert isinstance(app.screen, MainScreen)
-
-            # Check that forecast is unchanged
-            updated_forecast_table = app.screen.query_one("#forecast_table", DataTable)
-            updated_first_row_cells = list(updated_forecast_table.get_row_at(0))
-            updated_balance_text = updated_first_row_cells[3].plain
-            updated_balance = parse_currency_from_text(
-                updated_balance_text, app.state.currency_code
-            )
+        # Should be back on main screen
+        assert isinstance(app.screen, MainScreen)
 
-            # Balance should be unchanged
-            assert updated_balance == initial_balance
+        # Check that the forecast updated
+        # The main screen is the same, so is its forecast table
+        updated_balance_text = _balance_at(forecast_table)
+        updated_balance = parse_currency_from_text(
+            updated_balance_text, app.state.currency_code
+        )
 
-    async def test_enter_on_empty_expense_list(self):
-        """Test that pressing Enter on empty expense list doesn't crash."""
-        # Create a completely empty state file
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-            empty_state = FinancialState()
-            empty_state.to_json_file(f.name)
+        expected_balance = initial_balance + sign * Decimal(amount)
+        assert updated_balance == expected_balance, (
+            f"Expected balance {expected_balance}, got {updated_balance}"
+        )
 
-            app = BudgetApp(state_file=f.name)
-            async with app.run_test() as pilot:
-                await pilot.pause()
+    async def test_add_entry_from_main_screen_cancel(self, read_only_app):
+        """Test canceling the add entry flow from main screen."""
+        app, pilot = read_only_app
+        # Get initial forecast data
+        forecast_table = app.screen.query_one("#forecast_table", DataTable)
+        initial_balance_text = _balance_at(forecast_table)
+        initial_balance = parse_currency_from_text(
+            initial_balance_text, app.state.currency_code
+        )
 
-                # Navigate to expense management (truly empty)
-                await pilot.press("e")
-                await pilot.pause()
+        # Press Insert to add entry from main screen
+        await pilot.press("insert")
 
-                # Press Enter on empty list - this should not crash
-                await pilot.press("enter")
-                await pilot.pause()
+        # Cancel the entry type modal
+        await pilot.press("escape")
+        await pilot.pause(0)
 
-                # Should still be on the manage entries screen
-                assert app.screen.__class__.__name__ == "ManageEntriesScreen"
+        # Should be back on main screen with no changes
+        assert isinstance(app.screen, MainScreen)
 
-    async def test_enter_on_empty_income_list(self):
-        """Test that pressing Enter on truly empty income list doesn't crash."""
-        # Create a completely empty state file
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-            empty_state = FinancialState()
-            empty_state.to_json_file(f.name)
+        # Check that forecast is unchanged
+        # The main screen is the same, so is its forecast table
+        updated_balance_text = _balance_at(forecast_table)
+        updated_balance = parse_currency_from_text(
+            updated_balance_text, app.state.currency_code
+        )
 
-            app = BudgetApp(state_file=f.name)
-            async with app.run_test() as pilot:
-                await pilot.pause()
+        # Balance should be unchanged
+        assert updated_balance == initial_balance
 
-                # Navigate to income management (truly empty)
-                await pilot.press("i")
-                await pilot.pause()
+    @pytest.mark.parametrize("key", ["e", "i"], ids=["expenses", "income"])
+    async def test_enter_on_empty_entry_list(self, reset_app, empty_state, key):
+        """Test that pressing Enter on an empty expense/income list doesn't crash."""
+        app, pilot = await reset_app(empty_state)
+        # Navigate to expense/income management (truly empty)
+        await pilot.press(key)
 
-                # Press Enter on empty list - this should not crash
-                await pilot.press("enter")
-                await pilot.pause()
+        # Press Enter on empty list - this should not crash
+        await pilot.press("enter")
+        await pilot.pause(0)
 
-                # Should still be on the manage entries screen
-                assert app.screen.__class__.__name__ == "ManageEntriesScreen"
+        # Should still be on the manage entries screen
+        assert app.screen.__class__.__name__ == "ManageEntriesScreen"
 
 
 class TestManageEntriesScreen:
@@ -443,184 +451,149 @@ class TestManageEntriesScreen:
     def sample_entries(self):
         """Create sample financial entries for testing."""
         return [
-            FinancialEntry(
-                amount=Decimal("1000"),
-                description="Salary",
-                type=EntryType.INCOME,
-                category="Job",
-                recurrence=Recurrence(
-                    type=RecurrenceType.MONTHLY,
-                    start_date=date(2024, 1, 1),
-                ),
-            ),
-            FinancialEntry(
-                amount=Decimal("500"),
-                description="Rent",
-                type=EntryType.EXPENSE,
-                category="Housing",
-                recurrence=Recurrence(
-                    type=RecurrenceType.MONTHLY,
-                    start_date=date(2024, 1, 1),
-                ),
-            ),
+            _monthly_entry("Salary", "1000", EntryType.INCOME, "Job"),
+            _monthly_entry("Rent", "500", EntryType.EXPENSE, "Housing"),
         ]
 
-    async def test_entries_table_displays_data(
-        self, sample_entries, basic_temp_state_file
-    ):
+    async def test_entries_table_displays_data(self, sample_entries, read_only_app):
         """Test that entries are displayed correctly in the table."""
-        from moomoolah.budget_app import ManageEntriesScreen
-
-        app = BudgetApp(state_file=basic_temp_state_file)
         expenses = [e for e in sample_entries if e.type == EntryType.EXPENSE]
 
-        async with app.run_test() as pilot:
-            await pilot.pause()
-            screen = ManageEntriesScreen(EntryType.EXPENSE, expenses, app.state)
-            app.push_screen(screen)
-            await pilot.pause()
+        app, pilot = read_only_app
+        screen = ManageEntriesScreen(EntryType.EXPENSE, expenses, app.state)
+        await app.push_screen(screen)
 
-            entries_table = app.screen.query_one("#entries_table", DataTable)
-            assert entries_table.row_count == 1  # One expense entry
+        entries_table = app.screen.query_one("#entries_table", DataTable)
+        assert entries_table.row_count == 1  # One expense entry
 
-            # Check table columns
-            column_labels = [col.label.plain for col in entries_table.columns.values()]
-            assert column_labels == ["Description", "Amount", "Recurrence", "Category"]
+        # Check table columns
+        column_labels = [col.label.plain for col in entries_table.columns.values()]
+        assert column_labels == ["Description", "Amount", "Recurrence", "Category"]
 
-    async def test_back_navigation_with_escape(
-        self, sample_entries, basic_temp_state_file
-    ):
+    async def test_entries_table_renders_in_batches(self, read_only_app):
+        """Test that long entry lists are rendered in batches on demand."""
+        expenses = [
+            _monthly_entry(f"Expense {i}", "10", EntryType.EXPENSE, "Test")
+            for i in range(120)
+        ]
+        app, pilot = read_only_app
+        screen = ManageEntriesScreen(EntryType.EXPENSE, expenses, app.state)
+        await app.push_screen(screen)
+
+        entries_table = app.screen.query_one("#entries_table", DataTable)
+        # first batch, plus the "show more" row
+        assert entries_table.row_count == 51
+
+        await pilot.press("m")
+        await pilot.pause(0)
+        assert entries_table.row_count == 101
+
+        # last batch renders the remaining entries, without "show more" row
+        await pilot.press("m")
+        await pilot.pause(0)
+        assert entries_table.row_count == 120
+
+    async def test_entries_table_reflects_edits(self, reset_app, basic_state):
+        """Test that deleting and adding entries updates the table rows in place."""
+        app, pilot = await reset_app(basic_state)
+        # the basic state has a single income entry
+        await pilot.press("i")
+        await pilot.pause(0)
+        entries_table = app.screen.query_one("#entries_table", DataTable)
+        assert entries_table.get_cell_at((0, 0)) == "Test Income"
+
+        # delete it: the placeholder row should be shown
+        await pilot.press("delete")
+        await pilot.click("#confirmation_yes")
+        assert entries_table.row_count == 1
+        assert entries_table.get_cell_at((0, 0)).plain == "No entries yet"
+
+        # add a new one: it should replace the placeholder row
+        await pilot.press("insert")
+        app.screen.query_one("#entry_description").value = "New Income"
+        app.screen.query_one("#entry_amount").value = "50"
+        await pilot.click("#entry_save")
+        assert entries_table.row_count == 1
+        assert entries_table.get_cell_at((0, 0)) == "New Income"
+
+    async def test_back_navigation_with_escape(self, sample_entries, read_only_app):
         """Test that escape key navigates back from entries screen."""
-        from moomoolah.budget_app import ManageEntriesScreen
-
-        app = BudgetApp(state_file=basic_temp_state_file)
         expenses = [e for e in sample_entries if e.type == EntryType.EXPENSE]
 
-        async with app.run_test() as pilot:
-            await pilot.pause()  # Wait for main screen
-            screen = ManageEntriesScreen(EntryType.EXPENSE, expenses, app.state)
-            app.push_screen(screen)
-            await pilot.pause()
+        app, pilot = read_only_app
+        screen = ManageEntriesScreen(EntryType.EXPENSE, expenses, app.state)
+        await app.push_screen(screen)
 
-            # Press escape to go back
-            await pilot.press("escape")
-            await pilot.pause()
+        # Press escape to go back
+        await pilot.press("escape")
+        await pilot.pause(0)
 
-            # Should be back to main screen
-            assert isinstance(app.screen, MainScreen)
+        # Should be back to main screen
+        assert isinstance(app.screen, MainScreen)
 
-    async def test_back_navigation_with_backspace(
-        self, sample_entries, basic_temp_state_file
-    ):
+    async def test_back_navigation_with_backspace(self, sample_entries, read_only_app):
         """Test that backspace key navigates back from entries screen."""
-        from moomoolah.budget_app import ManageEntriesScreen
-
-        app = BudgetApp(state_file=basic_temp_state_file)
         expenses = [e for e in sample_entries if e.type == EntryType.EXPENSE]
 
-        async with app.run_test() as pilot:
-            await pilot.pause()  # Wait for main screen
-            screen = ManageEntriesScreen(EntryType.EXPENSE, expenses, app.state)
-            app.push_screen(screen)
-            await pilot.pause()
+        app, pilot = read_only_app
+        screen = ManageEntriesScreen(EntryType.EXPENSE, expenses, app.state)
+        await app.push_screen(screen)
 
-            # Press backspace to go back
-            await pilot.press("backspace")
-            await pilot.pause()
+        # Press backspace to go back
+        await pilot.press("backspace")
+        await pilot.pause(0)
 
-            # Should be back to main screen
-            assert isinstance(app.screen, MainScreen)
+        # Should be back to main screen
+        assert isinstance(app.screen, MainScreen)
 
 
 class TestConfirmationModal:
     """Test the ConfirmationModal widget."""
 
-    async def test_confirmation_modal_yes_button(self, basic_temp_state_file):
-        """Test that clicking 'Yes' returns True."""
-        from moomoolah.widgets import ConfirmationModal
-
-        app = BudgetApp(state_file=basic_temp_state_file)
-        async with app.run_test() as pilot:
-            await pilot.pause()
-            modal = ConfirmationModal("Are you sure?")
-
-            # Start the modal and get the future
-            app.push_screen(modal)
-            await pilot.pause()
-
-            # Click Yes button
-            await pilot.click("#confirmation_yes")
-            await pilot.pause()
-
-            # Modal should be dismissed, check that we're back to main screen
-            assert isinstance(app.screen, MainScreen)
-
-    async def test_confirmation_modal_no_button(self, basic_temp_state_file):
-        """Test that clicking 'No' returns False."""
-        from moomoolah.widgets import ConfirmationModal
-
-        app = BudgetApp(state_file=basic_temp_state_file)
-        async with app.run_test() as pilot:
-            await pilot.pause()
-            modal = ConfirmationModal("Are you sure?")
-
-            # Start the modal
-            app.push_screen(modal)
-            await pilot.pause()
-
-            # Click No button
-            await pilot.click("#confirmation_no")
-            await pilot.pause()
-
-            # Modal should be dismissed, check that we're back to main screen
-            assert isinstance(app.screen, MainScreen)
-
-    async def test_confirmation_modal_escape_key(self, basic_temp_state_file):
-        """Test that escape key cancels the modal."""
-        from moomoolah.widgets import ConfirmationModal
-
-        app = BudgetApp(state_file=basic_temp_state_file)
-        async with app.run_test() as pilot:
-            await pilot.pause()
-            modal = ConfirmationModal("Are you sure?")
-
-            # Start the modal
-            app.push_screen(modal)
-            await pilot.pause()
-
-            # Press escape to cancel
-            await pilot.press("escape")
-            await pilot.pause()
-
-            # Modal should be dismissed, check that we're back to main screen
-            assert isinstance(app.screen, MainScreen)
-
-    async def test_confirmation_modal_arrow_keys(self, basic_temp_state_file):
+    @pytest.mark.parametrize(
+        "action,target,expected_results",
+        [
+            ("click", "#confirmation_yes", [True]),
+            ("click", "#confirmation_no", [False]),
+            # escape pops the modal without a result
+            ("press", "escape", []),
+        ],
+        ids=["yes_button", "no_button", "escape_key"],
+    )
+    async def test_confirmation_modal_dismiss(
+        self, read_only_app, action, target, expected_results
+    ):
+        """Test the results of the ways to dismiss the modal."""
+        app, pilot = read_only_app
+        modal = ConfirmationModal("Are you sure?")
+        results = []
+        await app.push_screen(modal, results.append)
+
+        if action == "click":
+            await pilot.click(target)
+        else:
+            await pilot.press(target)
+            await pilot.pause(0)
+
+        # Modal should be dismissed, check that we're back to main screen
+        assert isinstance(app.screen, MainScreen)
+        assert results == expected_results
+
+    async def test_confirmation_modal_arrow_keys(self, read_only_app):
         """Test that left/right arrow keys change focus between buttons."""
-        from moomoolah.widgets import ConfirmationModal
-
-        app = BudgetApp(state_file=basic_temp_state_file)
-        async with app.run_test() as pilot:
-            await pilot.pause()
-            modal = ConfirmationModal("Are you sure?")
-
-            # Start the modal
-            app.push_screen(modal)
-            await pilot.pause()
-
-            # Test that arrow keys navigate between buttons
-            await pilot.press("right")
-            await pilot.pause()
+        app, pilot = read_only_app
+        modal = ConfirmationModal("Are you sure?")
 
-            await pilot.press("left")
-            await pilot.pause()
+        # Start the modal
+        await app.push_screen(modal)
 
-            # Press Enter on focused button (should be Yes button after left arrow)
-            await pilot.press("enter")
-            await pilot.pause()
+        # Move focus right and back left, then press Enter on the focused button
+        # (should be Yes button after left arrow)
+        await pilot.press("right", "left", "enter")
+        await pilot.pause(0)
 
-            # Modal should be dismissed, back to main screen
-            assert isinstance(app.screen, MainScreen)
+        # Modal should be dismissed, back to main screen
+        assert isinstance(app.screen, MainScreen)
 
 
 class TestUpdateEntryModal:
@@ -629,877 +602,542 @@ class TestUpdateEntryModal:
     @pytest.fixture
     def sample_entry(self):
         """Create a sample entry for testing."""
-        return FinancialEntry(
-            amount=Decimal("100"),
-            description="Test Entry",
-            type=EntryType.EXPENSE,
-            category="Test",
-            recurrence=Recurrence(
-                type=RecurrenceType.MONTHLY,
-                start_date=date(2024, 1, 1),
-            ),
-        )
+        return _monthly_entry("Test Entry", "100", EntryType.EXPENSE, "Test")
 
-    async def test_update_entry_modal_cancel(self, sample_entry, basic_temp_state_file):
+    async def test_update_entry_modal_cancel(self, read_only_app, sample_entry):
         """Test that cancel button dismisses modal."""
-        from moomoolah.budget_app import UpdateEntryModal
+        app, pilot = read_only_app
+        modal = UpdateEntryModal(sample_entry)
 
-        app = BudgetApp(state_file=basic_temp_state_file)
-        async with app.run_test(size=(120, 40)) as pilot:  # Larger screen for modal
-            await pilot.pause()
-            modal = UpdateEntryModal(sample_entry)
+        # Start the modal
+        await app.push_screen(modal)
 
-            # Start the modal
-            app.push_screen(modal)
-            await pilot.pause()
+        # Click Cancel button
+        await pilot.click("#entry_cancel")
 
-            # Click Cancel button
-            await pilot.click("#entry_cancel")
-            await pilot.pause()
-
-            # Modal should be dismissed, back to main screen
-            assert isinstance(app.screen, MainScreen)
+        # Modal should be dismissed, back to main screen
+        assert isinstance(app.screen, MainScreen)
 
     async def test_update_entry_modal_form_fields_populated(
-        self, sample_entry, basic_temp_state_file
+        self, read_only_app, sample_entry
     ):
         """Test that form fields are populated with entry data."""
-        from moomoolah.budget_app import UpdateEntryModal
+        app, pilot = read_only_app
+        modal = UpdateEntryModal(sample_entry)
+        await app.push_screen(modal)
 
-        app = BudgetApp(state_file=basic_temp_state_file)
-        async with app.run_test(size=(120, 40)) as pilot:  # Larger screen for modal
-            await pilot.pause()
-            modal = UpdateEntryModal(sample_entry)
-            app.push_screen(modal)
-            await pilot.pause()
+        # Check that fields are populated correctly
+        description_input = app.screen.query_one("#entry_description")
+        assert description_input.value == "Test Entry"
 
-            # Check that fields are populated correctly
-            description_input = app.screen.query_one("#entry_description")
-            assert description_input.value == "Test Entry"
+        amount_input = app.screen.query_one("#entry_amount")
+        assert amount_input.value == "100"
 
-            amount_input = app.screen.query_one("#entry_amount")
-            assert amount_input.value == "100"
+        category_input = app.screen.query_one("#entry_category")
+        assert category_input.value == "Test"
 
-            category_input = app.screen.query_one("#entry_category")
-            assert category_input.value == "Test"
+    async def test_update_entry_modal_reloads_fields_when_reused(
+        self, read_only_app, sample_entry
+    ):
+        """Test that the reused entry form shows the entry it was loaded with."""
+        app, pilot = read_only_app
+        modal = app.get_update_entry_modal(sample_entry)
+        await app.push_screen(modal)
+        await pilot.click("#entry_cancel")
+
+        other_entry = FinancialEntry(
+            amount=Decimal("42.50"),
+            description="Gym",
+            type=EntryType.EXPENSE,
+            category="Health",
+            recurrence=Recurrence(
+                type=RecurrenceType.ANNUAL,
+                start_date=date(2024, 3, 1),
+            ),
+        )
+        assert app.get_update_entry_modal(other_entry, "Edit Gym") is modal
+        app.push_screen(modal)
+        # the radio set updates its pressed button through messages
+        await pilot.pause(0)
+
+        screen = app.screen
+        assert str(screen.query_one("#modal_title").renderable) == "Edit Gym"
+        assert screen.query_one("#entry_description").value == "Gym"
+        assert screen.query_one("#entry_amount").value == "42.50"
+        assert screen.query_one("#entry_category").value == "Health"
+        assert screen.query_one("#entry_start_date").value == "2024-03-01"
+        radio_set = screen.query_one("#entry_recurrence")
+        assert radio_set.pressed_button.label.plain == "ANNUAL"
+
+    async def test_update_entry_modal_saves_end_date(self, read_only_app, sample_entry):
+        """Test that the end date entered in the form is kept on save."""
+        app, pilot = read_only_app
+        results = []
+        modal = app.get_update_entry_modal(sample_entry)
+        await app.push_screen(modal, results.append)
+
+        app.screen.query_one("#end_date").value = "2024-12-31"
+        await pilot.click("#entry_save")
+
+        assert results[0].recurrence.end_date == date(2024, 12, 31)
 
     async def test_when_user_press_enter_in_update_entry_modal_then_save_entry(
-        self, sample_entry, basic_temp_state_file
+        self, read_only_app, sample_entry
     ):
-        from moomoolah.budget_app import UpdateEntryModal
+        app, pilot = read_only_app
+        modal = UpdateEntryModal(sample_entry, "Test Modal")
 
-        app = BudgetApp(state_file=basic_temp_state_file)
-        async with app.run_test(size=(120, 40)) as pilot:
-            await pilot.pause()
-            modal = UpdateEntryModal(sample_entry, "Test Modal")
-
-            # Push the modal to the screen
-            app.push_screen(modal)
-            await pilot.pause()
+        # Push the modal to the screen
+        await app.push_screen(modal)
 
-            # Modify a field to test the save
-            description_input = app.screen.query_one("#entry_description")
-            description_input.value = "Updated Test Entry"
+        # Modify a field to test the save
+        description_input = app.screen.query_one("#entry_description")
+        description_input.value = "Updated Test Entry"
 
-            # Press ENTER to save - this should trigger the save action
-            await pilot.press("enter")
-            await pilot.pause()
+        # Press ENTER to save - this should trigger the save action
+        await pilot.press("enter")
+        await pilot.pause(0)
 
-            # Modal should be dismissed, back to main screen
-            assert isinstance(app.screen, MainScreen)
+        # Modal should be dismissed, back to main screen
+        assert isinstance(app.screen, MainScreen)
 
 
 class TestUnsavedChanges:
     """Test the unsaved changes tracking functionality."""
 
-    async def test_app_starts_with_no_unsaved_changes(self):
+    async def test_app_starts_with_no_unsaved_changes(self, empty_state):
         """Test that app starts with no unsaved changes indicator."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-            state = FinancialState()
-            state.to_json_file(f.name)
-
-            app = BudgetApp(state_file=f.name)
-            async with app.run_test() as pilot:
-                await pilot.pause()
-
-                # App should start with no unsaved changes
-                assert not app.has_unsaved_changes
-                assert app.title == "MooMoolah - Personal Budget Planner"
-
-    async def test_title_shows_asterisk_when_unsaved_changes(self):
+        app = BudgetApp(state=empty_state)
+        async with app.run_test():
+            # App should start with no unsaved changes
+            assert not app.has_unsaved_changes
+            assert app.title == "MooMoolah - Personal Budget Planner"
+
+    async def test_title_shows_asterisk_when_unsaved_changes(
+        self, reset_app, empty_state
+    ):
         """Test that title shows asterisk when there are unsaved changes."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-            state = FinancialState()
-            state.to_json_file(f.name)
-
-            app = BudgetApp(state_file=f.name)
-            async with app.run_test() as pilot:
-                await pilot.pause()
-
-                # Mark changes as unsaved
-                app.mark_unsaved_changes()
+        app, pilot = await reset_app(empty_state)
+        # Mark changes as unsaved
+        app.mark_unsaved_changes()
 
-                # Title should show asterisk
-                assert app.has_unsaved_changes
-                assert app.title == "MooMoolah - Personal Budget Planner *"
+        # Title should show asterisk
+        assert app.has_unsaved_changes
+        assert app.title == "MooMoolah - Personal Budget Planner *"
 
-    async def test_save_removes_unsaved_changes_indicator(self):
+    async def test_save_removes_unsaved_changes_indicator(self, empty_state_file):
         """Test that saving removes the unsaved changes indicator."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-            state = FinancialState()
-            state.to_json_file(f.name)
-
-            app = BudgetApp(state_file=f.name)
-            async with app.run_test() as pilot:
-                await pilot.pause()
-
-                # Mark changes as unsaved
-                app.mark_unsaved_changes()
-                assert app.has_unsaved_changes
-                assert app.title == "MooMoolah - Personal Budget Planner *"
-
-                # Save the state
-                await pilot.press("ctrl+s")
-                await pilot.pause()
-
-                # Unsaved changes should be cleared
-                assert not app.has_unsaved_changes
-                assert app.title == "MooMoolah - Personal Budget Planner"
-
-    async def test_adding_entry_marks_unsaved_changes(self):
-        """Test that adding an entry marks the app as having unsaved changes."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-            state = FinancialState()
-            state.to_json_file(f.name)
-
-            app = BudgetApp(state_file=f.name)
-            async with app.run_test(size=(120, 50)) as pilot:
-                await pilot.pause()
-
-                # Initially no unsaved changes
-                assert not app.has_unsaved_changes
-                assert app.title == "MooMoolah - Personal Budget Planner"
-
-                # Add entry from main screen
-                await pilot.press("insert")
-                await pilot.pause()
-
-                # Choose expense
-                await pilot.click("#add_expense")
-                await pilot.pause()
-
-                # Fill out form
-                description_input = app.screen.query_one("#entry_description")
-                await pilot.click("#entry_description")
-                description_input.value = "Test Expense"
-
-                amount_input = app.screen.query_one("#entry_amount")
-                await pilot.click("#entry_amount")
-                amount_input.value = "100"
-
-                category_input = app.screen.query_one("#entry_category")
-                await pilot.click("#entry_category")
-                category_input.value = "Test"
-
-                start_date_input = app.screen.query_one("#entry_start_date")
-                await pilot.click("#entry_start_date")
-                start_date_input.value = "2024-01-01"
-
-                every_input = app.screen.query_one("#entry_every")
-                await pilot.click("#entry_every")
-                every_input.value = "1"
-
-                # Save the entry
-                await pilot.click("#entry_save")
-                await pilot.pause()
-
-                # Should now have unsaved changes
-                assert app.has_unsaved_changes
-                assert app.title == "MooMoolah - Personal Budget Planner *"
-
-    async def test_modifying_entry_marks_unsaved_changes(self):
-        """Test that modifying an entry marks the app as having unsaved changes."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-            state = FinancialState()
-            state.add_entry(
-                FinancialEntry(
-                    amount=Decimal("100"),
-                    description="Original Entry",
-                    type=EntryType.EXPENSE,
-                    category="Test",
-                    recurrence=Recurrence(
-                        type=RecurrenceType.MONTHLY,
-                        start_date=date(2024, 1, 1),
-                    ),
-                )
-            )
-            state.to_json_file(f.name)
-
-            app = BudgetApp(state_file=f.name)
-            async with app.run_test(size=(120, 50)) as pilot:
-                await pilot.pause()
-
-                # Initially no unsaved changes
-                assert not app.has_unsaved_changes
-
-                # Navigate to expense management
-                await pilot.press("e")
-                await pilot.pause()
-
-                # Click on the entry to edit it
-                await pilot.click("#entries_table")
-                await pilot.press("enter")
-                await pilot.pause()
-
-                # Modify the description
-                description_input = app.screen.query_one("#entry_description")
-                await pilot.click("#entry_description")
-                description_input.value = "Modified Entry"
-
-                # Save the changes
-                await pilot.click("#entry_save")
-                await pilot.pause()
-
-                # Should now have unsaved changes
-                assert app.has_unsaved_changes
-                assert app.title == "MooMoolah - Personal Budget Planner *"
-
-    async def test_deleting_entry_marks_unsaved_changes(self):
-        """Test that deleting an entry marks the app as having unsaved changes."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-            state = FinancialState()
-            state.add_entry(
-                FinancialEntry(
-                    amount=Decimal("100"),
-                    description="Entry to Delete",
-                    type=EntryType.EXPENSE,
-                    category="Test",
-                    recurrence=Recurrence(
-                        type=RecurrenceType.MONTHLY,
-                        start_date=date(2024, 1, 1),
-                    ),
-                )
-            )
-            state.to_json_file(f.name)
-
-            app = BudgetApp(state_file=f.name)
-            async with app.run_test(size=(120, 50)) as pilot:
-                await pilot.pause()
-
-                # Initially no unsaved changes
-                assert not app.has_unsaved_changes
-
-                # Navigate to expense management
-                await pilot.press("e")
-                await pilot.pause()
-
-                # Delete the entry
-                await pilot.press("delete")
-                await pilot.pause()
+        app = BudgetApp(state_file=empty_state_file)
+        async with app.run_test() as pilot:
+            await app.workers.wait_for_complete()
+            await pilot.pause(0)
+
+            # Mark changes as unsaved
+            app.mark_unsaved_changes()
+            assert app.has_unsaved_changes
+            assert app.title == "MooMoolah - Personal Budget Planner *"
+
+            # Save the state
+            await app.run_action("save_state")
+            await app.workers.wait_for_complete()
+            await pilot.pause(0)
+
+            # Unsaved changes should be cleared
+            assert not app.has_unsaved_changes
+            assert app.title == "MooMoolah - Personal Budget Planner"
+
+    @pytest.mark.parametrize(
+        "action",
+        [_add_expense, _modify_first_expense, _delete_first_expense],
+        ids=["adding", "modifying", "deleting"],
+    )
+    async def test_changing_entries_marks_unsaved_changes(
+        self, reset_app, one_expense_state, action
+    ):
+        """Test that adding, modifying or deleting an entry marks unsaved changes."""
+        app, pilot = await reset_app(one_expense_state)
+        # Initially no unsaved changes
+        assert not app.has_unsaved_changes
+        assert app.title == "MooMoolah - Personal Budget Planner"
 
-                # Confirm deletion
-                await pilot.click("#confirmation_yes")
-                await pilot.pause()
+        await action(app, pilot)
 
-                # Should now have unsaved changes
-                assert app.has_unsaved_changes
-                assert app.title == "MooMoolah - Personal Budget Planner *"
+        # Should now have unsaved changes
+        assert app.has_unsaved_changes
+        assert app.title == "MooMoolah - Personal Budget Planner *"
 
-    async def test_quit_with_no_unsaved_changes_quits_immediately(self):
+    async def test_quit_with_no_unsaved_changes_quits_immediately(self, empty_state):
         """Test that quitting with no unsaved changes quits immediately."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-            state = FinancialState()
-            state.to_json_file(f.name)
-
-            app = BudgetApp(state_file=f.name)
-            async with app.run_test() as pilot:
-                await pilot.pause()
-
-                # No unsaved changes initially
-                assert not app.has_unsaved_changes
+        app = BudgetApp(state=empty_state)
+        async with app.run_test() as pilot:
+            # No unsaved changes initially
+            assert not app.has_unsaved_changes
 
-                # Quit should work without confirmation
-                await pilot.press("ctrl+q")
-                await pilot.pause()
+            # Quit should work without confirmation
+            await pilot.press("ctrl+q")
+            await pilot.pause(0)
 
-                # App should have exited (this test passes if no exception occurs)
+            # App should have exited (this test passes if no exception occurs)
 
-    async def test_quit_with_unsaved_changes_shows_confirmation(self):
+    async def test_quit_with_unsaved_changes_shows_confirmation(self, empty_state):
         """Test that quitting with unsaved changes shows confirmation dialog."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-            state = FinancialState()
-            state.to_json_file(f.name)
-
-            app = BudgetApp(state_file=f.name)
-            async with app.run_test(size=(120, 50)) as pilot:
-                await pilot.pause()
-
-                # Mark unsaved changes
-                app.mark_unsaved_changes()
-                assert app.has_unsaved_changes
-
-                # Try to quit
-                await pilot.press("ctrl+q")
-                await pilot.pause()
-
-                # Should show confirmation modal
-                # Check that we can see the confirmation buttons
-                yes_button = app.screen.query_one("#confirmation_yes")
-                no_button = app.screen.query_one("#confirmation_no")
-                assert yes_button is not None
-                assert no_button is not None
-
-    async def test_quit_confirmation_no_cancels_quit(self):
+        app = BudgetApp(state=empty_state)
+        async with app.run_test(size=(120, 50)) as pilot:
+            # Mark unsaved changes
+            app.mark_unsaved_changes()
+            assert app.has_unsaved_changes
+
+            # Try to quit, the Ctrl+Q binding is covered by the test above
+            await app.run_action("quit")
+            await pilot.pause(0)
+
+            # Should show confirmation modal
+            # Check that we can see the confirmation buttons
+            yes_button = app.screen.query_one("#confirmation_yes")
+            no_button = app.screen.query_one("#confirmation_no")
+            assert yes_button is not None
+            assert no_button is not None
+
+    async def test_quit_confirmation_no_cancels_quit(self, empty_state):
         """Test that clicking 'No' in quit confirmation cancels the quit."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-            state = FinancialState()
-            state.to_json_file(f.name)
-
-            app = BudgetApp(state_file=f.name)
-            async with app.run_test(size=(120, 50)) as pilot:
-                await pilot.pause()
-
-                # Mark unsaved changes
-                app.mark_unsaved_changes()
+        app = BudgetApp(state=empty_state)
+        async with app.run_test(size=(120, 50)) as pilot:
+            # Mark unsaved changes
+            app.mark_unsaved_changes()
 
-                # Try to quit
-                await pilot.press("ctrl+q")
-                await pilot.pause()
+            # Try to quit, then wait for the quit worker to lay out its modal
+            await app.run_action("quit")
+            await pilot.pause()
 
-                # Click No to cancel quit
-                await pilot.click("#confirmation_no")
-                await pilot.pause()
+            # Click No to cancel quit
+            await pilot.click("#confirmation_no")
 
-                # Should be back on main screen
-                assert isinstance(app.screen, MainScreen)
-                # Unsaved changes should still be marked
-                assert app.has_unsaved_changes
+            # Should be back on main screen
+            assert isinstance(app.screen, MainScreen)
+            # Unsaved changes should still be marked
+            assert app.has_unsaved_changes
 
 
 class TestEntryTypeModal:
     """Test the EntryTypeModal widget."""
 
-    async def test_entry_type_modal_expense_button(self, basic_temp_state_file):
+    async def test_entry_type_modal_expense_button(self, read_only_app):
         """Test that clicking 'Expense' returns EntryType.EXPENSE."""
-        from moomoolah.budget_app import EntryTypeModal
-
-        app = BudgetApp(state_file=basic_temp_state_file)
-        async with app.run_test() as pilot:
-            await pilot.pause()
-            modal = EntryTypeModal()
+        app, pilot = read_only_app
+        modal = EntryTypeModal()
 
-            # Start the modal
-            app.push_screen(modal)
-            await pilot.pause()
+        # Start the modal
+        await app.push_screen(modal)
 
-            # Click Expense button
-            await pilot.click("#add_expense")
-            await pilot.pause()
+        # Click Expense button
+        await pilot.click("#add_expense")
 
-            # Modal should be dismissed, check that we're back to main screen
-            assert isinstance(app.screen, MainScreen)
+        # Modal should be dismissed, check that we're back to main screen
+        assert isinstance(app.screen, MainScreen)
 
-    async def test_entry_type_modal_income_button(self, basic_temp_state_file):
+    async def test_entry_type_modal_income_button(self, read_only_app):
         """Test that clicking 'Income' returns EntryType.INCOME."""
-        from moomoolah.budget_app import EntryTypeModal
+        app, pilot = read_only_app
+        modal = EntryTypeModal()
 
-        app = BudgetApp(state_file=basic_temp_state_file)
-        async with app.run_test() as pilot:
-            await pilot.pause()
-            modal = EntryTypeModal()
+        # Start the modal
+        await app.push_screen(modal)
 
-            # Start the modal
-            app.push_screen(modal)
-            await pilot.pause()
+        # Click Income button
+        await pilot.click("#add_income")
 
-            # Click Income button
-            await pilot.click("#add_income")
-            await pilot.pause()
-
-            # Modal should be dismissed, check that we're back to main screen
-            assert isinstance(app.screen, MainScreen)
+        # Modal should be dismissed, check that we're back to main screen
+        assert isinstance(app.screen, MainScreen)
 
-    async def test_entry_type_modal_escape_key(self, basic_temp_state_file):
+    async def test_entry_type_modal_escape_key(self, read_only_app):
         """Test that escape key cancels the modal."""
-        from moomoolah.budget_app import EntryTypeModal
+        app, pilot = read_only_app
+        modal = EntryTypeModal()
 
-        app = BudgetApp(state_file=basic_temp_state_file)
-        async with app.run_test() as pilot:
-            await pilot.pause()
-            modal = EntryTypeModal()
+        # Start the modal
+        await app.push_screen(modal)
 
-            # Start the modal
-            app.push_screen(modal)
-            await pilot.pause()
+        # Press escape to cancel
+        await pilot.press("escape")
+        await pilot.pause(0)
 
-            # Press escape to cancel
-            await pilot.press("escape")
-            await pilot.pause()
-
-            # Modal should be dismissed, check that we're back to main screen
-            assert isinstance(app.screen, MainScreen)
+        # Modal should be dismissed, check that we're back to main screen
+        assert isinstance(app.screen, MainScreen)
 
-    async def test_entry_type_modal_arrow_keys(self, basic_temp_state_file):
+    async def test_entry_type_modal_arrow_keys(self, read_only_app):
         """Test that left/right arrow keys change focus between buttons."""
-        from moomoolah.budget_app import EntryTypeModal
+        app, pilot = read_only_app
+        modal = EntryTypeModal()
 
-        app = BudgetApp(state_file=basic_temp_state_file)
-        async with app.run_test() as pilot:
-            await pilot.pause()
-            modal = EntryTypeModal()
+        # Start the modal
+        await app.push_screen(modal)
 
-            # Start the modal
-            app.push_screen(modal)
-            await pilot.pause()
+        # Move focus right and back left, then press Enter on the focused button
+        # (should be Expense button after left arrow)
+        await pilot.press("right", "left", "enter")
+        await pilot.pause(0)
 
-            # Test that arrow keys navigate between buttons
-            await pilot.press("right")
-            await pilot.pause()
-
-            await pilot.press("left")
-            await pilot.pause()
-
-            # Press Enter on focused button (should be Expense button after left arrow)
-            await pilot.press("enter")
-            await pilot.pause()
-
-            # Modal should be dismissed, back to main screen
-            assert isinstance(app.screen, MainScreen)
+        # Modal should be dismissed, back to main screen
+        assert isinstance(app.screen, MainScreen)
 
 
 class TestMonthDetailModal:
     """Test the MonthDetailModal functionality."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def sample_state_with_varied_entries(self):
-        """Create a FinancialState with various entries for testing month details."""
-        state = FinancialState()
+        """Create a FinancialState with various entries for testing month details.
 
-        # Income entries
-        state.add_entry(
-            FinancialEntry(
-                amount=Decimal("3000"),
-                description="Salary",
-                type=EntryType.INCOME,
-                category="Job",
-                recurrence=Recurrence(
-                    type=RecurrenceType.MONTHLY,
-                    start_date=date(2024, 1, 1),
-                ),
-            )
-        )
-        state.add_entry(
-            FinancialEntry(
-                amount=Decimal("500"),
-                description="Freelance",
-                type=EntryType.INCOME,
-                category="Side Work",
-                recurrence=Recurrence(
-                    type=RecurrenceType.MONTHLY,
-                    start_date=date(2024, 1, 15),
+        The modal only reads the state, so it's built once for all the tests.
+        """
+        state = FinancialState()
+        state.add_entries(
+            [
+                # Income entries
+                _monthly_entry("Salary", "3000", EntryType.INCOME, "Job"),
+                _monthly_entry(
+                    "Freelance", "500", EntryType.INCOME, "Side Work", date(2024, 1, 15)
                 ),
-            )
-        )
-
-        # Expense entries
-        state.add_entry(
-            FinancialEntry(
-                amount=Decimal("1200"),
-                description="Rent",
-                type=EntryType.EXPENSE,
-                category="Housing",
-                recurrence=Recurrence(
-                    type=RecurrenceType.MONTHLY,
-                    start_date=date(2024, 1, 5),
+                # Expense entries
+                _monthly_entry(
+                    "Rent", "1200", EntryType.EXPENSE, "Housing", date(2024, 1, 5)
                 ),
-            )
-        )
-        state.add_entry(
-            FinancialEntry(
-                amount=Decimal("400"),
-                description="Groceries",
-                type=EntryType.EXPENSE,
-                category="Food",
-                recurrence=Recurrence(
-                    type=RecurrenceType.MONTHLY,
-                    start_date=date(2024, 1, 10),
+                _monthly_entry(
+                    "Groceries", "400", EntryType.EXPENSE, "Food", date(2024, 1, 10)
                 ),
-            )
-        )
-        state.add_entry(
-            FinancialEntry(
-                amount=Decimal("200"),
-                description="Phone",
-                type=EntryType.EXPENSE,
-                category="Utilities",
-                recurrence=Recurrence(
-                    type=RecurrenceType.MONTHLY,
-                    start_date=date(2024, 1, 20),
+                _monthly_entry(
+                    "Phone", "200", EntryType.EXPENSE, "Utilities", date(2024, 1, 20)
                 ),
-            )
+            ]
         )
-
         return state
 
     async def test_month_detail_modal_displays_summary_and_details(
-        self, sample_state_with_varied_entries, basic_temp_state_file
+        self, read_only_app, sample_state_with_varied_entries
     ):
         """Test that MonthDetailModal displays both summary and detail views."""
-        from moomoolah.budget_app import MonthDetailModal
-
-        app = BudgetApp(state_file=basic_temp_state_file)
-        async with app.run_test(size=(120, 50)) as pilot:
-            await pilot.pause()
-
-            # Create modal for January 2024
-            test_month = date(2024, 1, 1)
-            modal = MonthDetailModal(
-                month=test_month, state=sample_state_with_varied_entries
-            )
+        app, pilot = read_only_app
+        # Create modal for January 2024
+        test_month = date(2024, 1, 1)
+        modal = MonthDetailModal(
+            month=test_month, state=sample_state_with_varied_entries
+        )
 
-            app.push_screen(modal)
-            await pilot.pause()
+        await app.push_screen(modal)
 
-            # Check that summary table exists and has data
-            summary_table = app.screen.query_one("#month_summary_table", DataTable)
-            assert summary_table is not None
-            assert summary_table.row_count > 0
+        # Check that summary table exists and has data
+        summary_table = app.screen.query_one("#month_summary_table", DataTable)
+        assert summary_table is not None
+        assert summary_table.row_count > 0
 
-            # Check that details table exists and has data
-            details_table = app.screen.query_one("#month_details_table", DataTable)
-            assert details_table is not None
-            assert details_table.row_count > 0
+        # Check that details table exists and has data
+        details_table = app.screen.query_one("#month_details_table", DataTable)
+        assert details_table is not None
+        assert details_table.row_count > 0
 
     async def test_month_detail_modal_summary_shows_categories(
-        self, sample_state_with_varied_entries, basic_temp_state_file
+        self, read_only_app, sample_state_with_varied_entries
     ):
         """Test that summary table shows expenses and income by category."""
-        from moomoolah.budget_app import MonthDetailModal
-
-        app = BudgetApp(state_file=basic_temp_state_file)
-        async with app.run_test(size=(120, 50)) as pilot:
-            await pilot.pause()
-
-            test_month = date(2024, 1, 1)
-            modal = MonthDetailModal(
-                month=test_month, state=sample_state_with_varied_entries
-            )
+        app, pilot = read_only_app
+        test_month = date(2024, 1, 1)
+        modal = MonthDetailModal(
+            month=test_month, state=sample_state_with_varied_entries
+        )
 
-            app.push_screen(modal)
-            await pilot.pause()
+        await app.push_screen(modal)
 
-            summary_table = app.screen.query_one("#month_summary_table", DataTable)
+        summary_table = app.screen.query_one("#month_summary_table", DataTable)
 
-            # Should have categories: Job, Side Work, Housing, Food, Utilities
-            assert summary_table.row_count == 5
+        # Should have categories: Job, Side Work, Housing, Food, Utilities
+        assert summary_table.row_count == 5
 
-            # Get all category names from first column
-            categories = []
-            for row_index in range(summary_table.row_count):
-                row_cells = list(summary_table.get_row_at(row_index))
-                # First column is category name (string)
-                category_value = row_cells[0]
-                if hasattr(category_value, "plain"):
-                    categories.append(category_value.plain)
-                else:
-                    categories.append(str(category_value))
+        # Get all category names from first column (str() also handles Text cells)
+        categories = [str(cell) for cell in summary_table.get_column_at(0)]
 
-            assert "Job" in categories
-            assert "Side Work" in categories
-            assert "Housing" in categories
-            assert "Food" in categories
-            assert "Utilities" in categories
+        assert "Job" in categories
+        assert "Side Work" in categories
+        assert "Housing" in categories
+        assert "Food" in categories
+        assert "Utilities" in categories
 
     async def test_month_detail_modal_details_shows_individual_entries(
-        self, sample_state_with_varied_entries, basic_temp_state_file
+        self, read_only_app, sample_state_with_varied_entries
     ):
         """Test that details table shows individual entries with descriptions."""
-        from moomoolah.budget_app import MonthDetailModal
-
-        app = BudgetApp(state_file=basic_temp_state_file)
-        async with app.run_test(size=(120, 50)) as pilot:
-            await pilot.pause()
-
-            test_month = date(2024, 1, 1)
-            modal = MonthDetailModal(
-                month=test_month, state=sample_state_with_varied_entries
-            )
+        app, pilot = read_only_app
+        test_month = date(2024, 1, 1)
+        modal = MonthDetailModal(
+            month=test_month, state=sample_state_with_varied_entries
+        )
 
-            app.push_screen(modal)
-            await pilot.pause()
+        await app.push_screen(modal)
 
-            details_table = app.screen.query_one("#month_details_table", DataTable)
+        details_table = app.screen.query_one("#month_details_table", DataTable)
 
-            # Should have 5 entries total
-            assert details_table.row_count == 5
+        # Should have 5 entries total
+        assert details_table.row_count == 5
 
-            # Get all descriptions from the details table
-            descriptions = []
-            for row_index in range(details_table.row_count):
-                row_cells = list(details_table.get_row_at(row_index))
-                # First column is description (string)
-                desc_value = row_cells[0]
-                if hasattr(desc_value, "plain"):
-                    descriptions.append(desc_value.plain)
-                else:
-                    descriptions.append(str(desc_value))
+        # Get all descriptions from the first column of the details table
+        descriptions = [str(cell) for cell in details_table.get_column_at(0)]
 
-            assert "Salary" in descriptions
-            assert "Freelance" in descriptions
-            assert "Rent" in descriptions
-            assert "Groceries" in descriptions
-            assert "Phone" in descriptions
+        assert "Salary" in descriptions
+        assert "Freelance" in descriptions
+        assert "Rent" in descriptions
+        assert "Groceries" in descriptions
+        assert "Phone" in descriptions
 
     async def test_month_detail_modal_escape_closes_modal(
-        self, sample_state_with_varied_entries, basic_temp_state_file
+        self, read_only_app, sample_state_with_varied_entries
     ):
         """Test that escape key closes the month detail modal."""
-        from moomoolah.budget_app import MonthDetailModal
-
-        app = BudgetApp(state_file=basic_temp_state_file)
-        async with app.run_test(size=(120, 50)) as pilot:
-            await pilot.pause()
-
-            test_month = date(2024, 1, 1)
-            modal = MonthDetailModal(
-                month=test_month, state=sample_state_with_varied_entries
-            )
+        app, pilot = read_only_app
+        test_month = date(2024, 1, 1)
+        modal = MonthDetailModal(
+            month=test_month, state=sample_state_with_varied_entries
+        )
 
-            app.push_screen(modal)
-            await pilot.pause()
+        await app.push_screen(modal)
 
-            # Press escape to close modal
-            await pilot.press("escape")
-            await pilot.pause()
+        # Press escape to close modal
+        await pilot.press("escape")
+        await pilot.pause(0)
 
-            # Should be back on main screen
-            assert isinstance(app.screen, MainScreen)
+        # Should be back on main screen
+        assert isinstance(app.screen, MainScreen)
 
     async def test_month_detail_modal_close_button_closes_modal(
-        self, sample_state_with_varied_entries, basic_temp_state_file
+        self, read_only_app, sample_state_with_varied_entries
     ):
         """Test that clicking the close button closes the month detail modal."""
-        from moomoolah.budget_app import MonthDetailModal
+        app, pilot = read_only_app
+        test_month = date(2024, 1, 1)
+        modal = MonthDetailModal(
+            month=test_month, state=sample_state_with_varied_entries
+        )
 
-        app = BudgetApp(state_file=basic_temp_state_file)
-        async with app.run_test(size=(120, 50)) as pilot:
-            await pilot.pause()
+        await app.push_screen(modal)
 
-            test_month = date(2024, 1, 1)
-            modal = MonthDetailModal(
-                month=test_month, state=sample_state_with_varied_entries
-            )
+        # Click close button (now an X button in header)
+        await pilot.click("#close_button")
 
-            app.push_screen(modal)
-            await pilot.pause()
-
-            # Click close button (now an X button in header)
-            await pilot.click("#close_button")
-            await pilot.pause()
-
-            # Should be back on main screen
-            assert isinstance(app.screen, MainScreen)
+        # Should be back on main screen
+        assert isinstance(app.screen, MainScreen)
 
     async def test_month_detail_modal_displays_totals(
-        self, sample_state_with_varied_entries, basic_temp_state_file
+        self, read_only_app, sample_state_with_varied_entries
     ):
         """Test that modal displays calculated totals."""
-        from moomoolah.budget_app import MonthDetailModal
-
-        app = BudgetApp(state_file=basic_temp_state_file)
-        async with app.run_test(size=(120, 50)) as pilot:
-            await pilot.pause()
-
-            test_month = date(2024, 1, 1)
-            modal = MonthDetailModal(
-                month=test_month, state=sample_state_with_varied_entries
-            )
+        app, pilot = read_only_app
+        test_month = date(2024, 1, 1)
+        modal = MonthDetailModal(
+            month=test_month, state=sample_state_with_varied_entries
+        )
 
-            app.push_screen(modal)
-            await pilot.pause()
+        await app.push_screen(modal)
 
-            # Check that totals section exists and has content
-            totals_label = app.screen.query_one("#month_totals", Label)
-            totals_text = str(totals_label.renderable)
+        # Check that totals section exists and has content
+        totals_label = app.screen.query_one("#month_totals", Label)
+        totals_text = str(totals_label.renderable)
 
-            # Should contain totals information
-            assert "Total Income:" in totals_text
-            assert "Total Expenses:" in totals_text
-            assert "Balance:" in totals_text
+        # Should contain totals information
+        assert "Total Income:" in totals_text
+        assert "Total Expenses:" in totals_text
+        assert "Balance:" in totals_text
 
     async def test_month_detail_modal_displays_month_title(
-        self, sample_state_with_varied_entries, basic_temp_state_file
+        self, read_only_app, sample_state_with_varied_entries
     ):
         """Test that modal displays the correct month in title/label."""
-        from moomoolah.budget_app import MonthDetailModal
-
-        app = BudgetApp(state_file=basic_temp_state_file)
-        async with app.run_test(size=(120, 50)) as pilot:
-            await pilot.pause()
-
-            test_month = date(2024, 3, 1)  # March 2024
-            modal = MonthDetailModal(
-                month=test_month, state=sample_state_with_varied_entries
-            )
+        app, pilot = read_only_app
+        test_month = date(2024, 3, 1)  # March 2024
+        modal = MonthDetailModal(
+            month=test_month, state=sample_state_with_varied_entries
+        )
 
-            app.push_screen(modal)
-            await pilot.pause()
+        await app.push_screen(modal)
 
-            # Check that month is displayed somewhere (could be in title or label)
-            # This is a basic test to ensure month context is visible
-            month_label = app.screen.query_one("#month_title", Label)
-            label_text = month_label.renderable
-            if hasattr(label_text, "plain"):
-                assert "March 2024" in label_text.plain
-            else:
-                assert "March 2024" in str(label_text)
+        # Check that month is displayed somewhere (could be in title or label)
+        # This is a basic test to ensure month context is visible
+        month_label = app.screen.query_one("#month_title", Label)
+        label_text = month_label.renderable
+        if hasattr(label_text, "plain"):
+            assert "March 2024" in label_text.plain
+        else:
+            assert "March 2024" in str(label_text)
 
 
 class TestMainScreenRowSelection:
     """Test MainScreen row selection functionality for forecast and history tables."""
 
-    @pytest.fixture
-    def temp_state_file(self):
-        """Create a temporary state file for testing."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-            # Create a basic state with some test data
-            state = FinancialState()
-            state.add_entry(
-                FinancialEntry(
-                    amount=Decimal("2000"),
-                    description="Test Salary",
-                    type=EntryType.INCOME,
-                    category="Income",
-                    recurrence=Recurrence(
-                        type=RecurrenceType.MONTHLY,
-                        start_date=date(2024, 1, 1),
-                    ),
-                )
-            )
-            state.add_entry(
-                FinancialEntry(
-                    amount=Decimal("800"),
-                    description="Test Rent",
-                    type=EntryType.EXPENSE,
-                    category="Housing",
-                    recurrence=Recurrence(
-                        type=RecurrenceType.MONTHLY,
-                        start_date=date(2024, 1, 1),
-                    ),
-                )
-            )
-            state.to_json_file(f.name)
-            yield f.name
-
-    async def test_forecast_table_row_selection_opens_month_detail(
-        self, temp_state_file
-    ):
+    async def test_forecast_table_row_selection_opens_month_detail(self, read_only_app):
         """Test that selecting a row in forecast table opens MonthDetailModal."""
-        app = BudgetApp(state_file=temp_state_file)
-        async with app.run_test(size=(120, 50)) as pilot:
-            await pilot.pause()
-
-            # Get forecast table and click on first row
-            forecast_table = app.screen.query_one("#forecast_table", DataTable)
-            assert forecast_table.cursor_type == "row"  # Should be selectable
+        app, pilot = read_only_app
+        # Get forecast table and click on first row
+        forecast_table = app.screen.query_one("#forecast_table", DataTable)
+        assert forecast_table.cursor_type == "row"  # Should be selectable
 
-            # Click on first row to select it
-            await pilot.click("#forecast_table")
-            await pilot.press("enter")
-            await pilot.pause()
+        # Click on first row to select it
+        await pilot.click("#forecast_table")
+        await pilot.press("enter")
+        await pilot.pause(0)
 
-            # Should open MonthDetailModal
-            assert app.screen.__class__.__name__ == "MonthDetailModal"
+        # Should open MonthDetailModal
+        assert app.screen.__class__.__name__ == "MonthDetailModal"
 
-    async def test_history_table_row_selection_opens_month_detail(
-        self, temp_state_file
-    ):
+    async def test_history_table_row_selection_opens_month_detail(self, read_only_app):
         """Test that selecting a row in history table opens MonthDetailModal."""
-        app = BudgetApp(state_file=temp_state_file)
-        async with app.run_test(size=(120, 50)) as pilot:
-            await pilot.pause()
+        app, pilot = read_only_app
+        history_table = app.screen.query_one("#history_table", DataTable)
+        assert history_table.cursor_type == "row"  # Should be selectable
 
-            # Get history table and click on first row
-            history_table = app.screen.query_one("#history_table", DataTable)
-            assert history_table.cursor_type == "row"  # Should be selectable
+        # Select the first row, as pressing Enter on it would: clicking and
+        # pressing Enter is covered by the forecast table test above
+        history_table.action_select_cursor()
+        await pilot.pause(0)
 
-            # Click on first row to select it
-            await pilot.click("#history_table")
-            await pilot.press("enter")
-            await pilot.pause()
+        # Should open MonthDetailModal
+        assert app.screen.__class__.__name__ == "MonthDetailModal"
 
-            # Should open MonthDetailModal
-            assert app.screen.__class__.__name__ == "MonthDetailModal"
-
-    async def test_forecast_table_has_cursor_type_row(self, temp_state_file):
+    async def test_forecast_table_has_cursor_type_row(self, read_only_app):
         """Test that forecast table is configured with cursor_type='row'."""
-        app = BudgetApp(state_file=temp_state_file)
-        async with app.run_test() as pilot:
-            await pilot.pause()
+        app, pilot = read_only_app
+        forecast_table = app.screen.query_one("#forecast_table", DataTable)
+        assert forecast_table.cursor_type == "row"
 
-            forecast_table = app.screen.query_one("#forecast_table", DataTable)
-            assert forecast_table.cursor_type == "row"
-
-    async def test_history_table_has_cursor_type_row(self, temp_state_file):
+    async def test_history_table_has_cursor_type_row(self, read_only_app):
         """Test that history table is configured with cursor_type='row'."""
-        app = BudgetApp(state_file=temp_state_file)
-        async with app.run_test() as pilot:
-            await pilot.pause()
-
-            history_table = app.screen.query_one("#history_table", DataTable)
-            assert history_table.cursor_type == "row"
+        app, pilot = read_only_app
+        history_table = app.screen.query_one("#history_table", DataTable)
+        assert history_table.cursor_type == "row"
 
     async def test_month_detail_modal_opens_with_correct_month_data(
-        self, temp_state_file
+        self, read_only_app
     ):
         """Test that MonthDetailModal opens with data for the selected month."""
-        app = BudgetApp(state_file=temp_state_file)
-        async with app.run_test(size=(120, 50)) as pilot:
-            await pilot.pause()
+        app, pilot = read_only_app
+        # Select first row of forecast table (should be current month)
+        app.screen.query_one("#forecast_table", DataTable).action_select_cursor()
+        await pilot.pause(0)
 
-            # Select first row of forecast table (should be current month)
-            await pilot.click("#forecast_table")
-            await pilot.press("enter")
-            await pilot.pause()
+        # Should be on MonthDetailModal now, for the first forecast month
+        assert app.screen.__class__.__name__ == "MonthDetailModal"
+        first_month = next(iter(app.state.get_forecast_for_next_n_months(12)))
+        assert app.screen.month == first_month
 
-            # Should be on MonthDetailModal now
-            assert app.screen.__class__.__name__ == "MonthDetailModal"
+        # Check that modal has the expected data tables
+        summary_table = app.screen.query_one("#month_summary_table", DataTable)
+        details_table = app.screen.query_one("#month_details_table", DataTable)
 
-            # Check that modal has the expected data tables
-            summary_table = app.screen.query_one("#month_summary_table", DataTable)
-            details_table = app.screen.query_one("#month_details_table", DataTable)
-
-            assert summary_table is not None
-            assert details_table is not None
+        assert summary_table is not None
+        assert details_table is not None
 
 
 class TestDoubleEnterBugFix:
     """Test for the double ENTER key trigger bug fix."""
 
-    @pytest.fixture
-    def temp_state_file(self):
-        """Create a temporary state file for testing."""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-            state = FinancialState(
-                expenses=[],
-                incomes=[],
-            )
-            f.write(state.model_dump_json())
-            f.flush()
-            yield f.name
-
-    async def test_modify_entry_enter_key_no_double_trigger(self, temp_state_file):
+    async def test_modify_entry_enter_key_no_double_trigger(self, read_only_app):
         """Test that pressing ENTER in modify entry dialog doesn't double-trigger save."""
-        from moomoolah.budget_app import UpdateEntryModal
-        from moomoolah.state import (
-            FinancialEntry,
-            EntryType,
-            Recurrence,
-            RecurrenceType,
-        )
-        from datetime import date
-
-        app = BudgetApp(state_file=temp_state_file)
 
         # Create a sample entry to modify
         entry = FinancialEntry(
@@ -1514,28 +1152,16 @@ class TestDoubleEnterBugFix:
 
         # Create the modal directly
         modal = UpdateEntryModal(entry, "Test Modal")
+        app, pilot = read_only_app
+        # Push the modal onto the screen
+        await app.push_screen(modal)
 
-        async with app.run_test(size=(120, 50)) as pilot:
-            # Push the modal onto the screen
-            app.push_screen(modal)
-            await pilot.pause()
-
-            # Mock the dismiss method to count how many times it's called
-            original_dismiss = modal.dismiss
-            dismiss_count = 0
-
-            def mock_dismiss(result=None):
-                nonlocal dismiss_count
-                dismiss_count += 1
-                return original_dismiss(result)
+        # Spy on the dismiss method to count how many times it's called
+        modal.dismiss = MagicMock(wraps=modal.dismiss)
 
-            modal.dismiss = mock_dismiss
+        # Press ENTER - this should only trigger save once
+        await pilot.press("enter")
+        await pilot.pause(0)
 
-            # Press ENTER - this should only trigger save once
-            await pilot.press("enter")
-            await pilot.pause()
-
-            # Check that dismiss was called exactly once (not double-triggered)
-            assert dismiss_count == 1, (
-                f"Expected dismiss to be called once, but was called {dismiss_count} times"
-            )
+        # Check that dismiss was called exactly once (not double-triggered)
+        modal.dismiss.assert_called_once()
@@ -1,7 +1,6 @@
 """Tests for config module."""
 
 import os
-import tempfile
 from pathlib import Path
 from unittest.mock import patch
 
@@ -9,17 +8,16 @@ from unittest.mock import patch
 from moomoolah.config import get_default_state_file_path
 
 
-def test_get_default_state_file_path_with_xdg_data_home():
+def test_get_default_state_file_path_with_xdg_data_home(tmp_path):
     """Test that XDG_DATA_HOME is used when set."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        with patch.dict(os.environ, {"XDG_DATA_HOME": temp_dir}):
-            result = get_default_state_file_path()
-            expected = Path(temp_dir) / "moomoolah" / "state.json"
-            assert result == expected
-            # Verify directory was created
-            assert result.parent.exists()
-            # Verify permissions are set correctly (0o700)
-            assert oct(result.parent.stat().st_mode)[-3:] == "700"
+    with patch.dict(os.environ, {"XDG_DATA_HOME": str(tmp_path)}):
+        result = get_default_state_file_path()
+        expected = tmp_path / "moomoolah" / "state.json"
+        assert result == expected
+        # Verify directory was created
+        assert result.parent.exists()
+        # Verify permissions are set correctly (0o700)
+        assert oct(result.parent.stat().st_mode)[-3:] == "700"
 
 
 def test_get_default_state_file_path_without_xdg_data_home():
@@ -38,13 +36,12 @@ def test_get_default_state_file_path_without_xdg_data_home():
                     mock_chmod.assert_called_once_with(0o700)
 
 
-def test_get_default_state_file_path_creates_directory():
+def test_get_default_state_file_path_creates_directory(tmp_path):
     """Test that the moomoolah directory is created if it doesn't exist."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        test_data_dir = Path(temp_dir) / "test_data"
-        with patch.dict(os.environ, {"XDG_DATA_HOME": str(test_data_dir)}):
-            result = get_default_state_file_path()
-            # Verify the full path structure was created
-            assert result.parent.exists()
-            assert result.parent.name == "moomoolah"
-            assert result.name == "state.json"
+    test_data_dir = tmp_path / "test_data"
+    with patch.dict(os.environ, {"XDG_DATA_HOME": str(test_data_dir)}):
+        result = get_default_state_file_path()
+        # Verify the full path structure was created
+        assert result.parent.exists()
+        assert result.parent.name == "moomoolah"
+        assert result.name == "state.json"
@@ -1,14 +1,16 @@
 import os
-import tempfile
 from datetime import date
 from decimal import Decimal
 
+import pytest
+
 from moomoolah.state import (
     EntryType,
     FinancialEntry,
     FinancialState,
     Recurrence,
     RecurrenceType,
+    add_months,
 )
 
 
@@ -235,7 +237,7 @@ def test_financial_state__get_forecast_for_next_n_months():
         assert month_forecast.balance == Decimal("1200")
 
 
-def test_financial_state_to_json_file_sets_correct_permissions():
+def test_financial_state_to_json_file_sets_correct_permissions(tmp_path):
     """Test that to_json_file sets file permissions to 0o600 (owner read/write only)."""
     state = FinancialState()
     state.add_entry(
@@ -251,29 +253,77 @@ def test_financial_state_to_json_file_sets_correct_permissions():
         )
     )
 
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as temp_file:
-        temp_path = temp_file.name
+    temp_path = str(tmp_path / "state.json")
+
+    # Save state to file
+    state.to_json_file(temp_path)
+
+    # Check file permissions
+    file_stats = os.stat(temp_path)
+    file_mode = file_stats.st_mode
+    # Extract the permission bits (last 3 octal digits)
+    permissions = oct(file_mode)[-3:]
+    assert permissions == "600", f"Expected 600 permissions, got {permissions}"
+
+    # Verify file content is valid JSON and can be loaded back
+    loaded_state = FinancialState.from_json_file(temp_path)
+    assert len(loaded_state.income_entries) == 1
+    assert loaded_state.income_entries[0].description == "Test entry"
+
+
+def test_financial_state_to_json_file_replaces_existing_file(tmp_path):
+    """Test that to_json_file overwrites the file without leaving a temp file."""
+    file_path = str(tmp_path / "state.json")
+    FinancialState(currency_code="USD").to_json_file(file_path)
+    FinancialState(currency_code="BRL").to_json_file(file_path)
+
+    assert FinancialState.from_json_file(file_path).currency_code == "BRL"
+    assert os.listdir(tmp_path) == ["state.json"]
+
+
+def test_financial_state_to_json_file_ignores_stale_temp_file(tmp_path):
+    """Test that a temp file left behind with other permissions isn't reused."""
+    file_path = tmp_path / "state.json"
+    stale_tmp_path = tmp_path / "state.json.tmp"
+    stale_tmp_path.write_text("stale")
+    os.chmod(stale_tmp_path, 0o644)
 
-    try:
-        # Save state to file
-        state.to_json_file(temp_path)
+    FinancialState(currency_code="USD").to_json_file(str(file_path))
 
-        # Check file permissions
-        file_stats = os.stat(temp_path)
-        file_mode = file_stats.st_mode
-        # Extract the permission bits (last 3 octal digits)
-        permissions = oct(file_mode)[-3:]
-        assert permissions == "600", f"Expected 600 permissions, got {permissions}"
+    assert oct(os.stat(file_path).st_mode)[-3:] == "600"
+    assert FinancialState.from_json_file(str(file_path)).currency_code == "USD"
+    assert os.listdir(tmp_path) == ["state.json"]
 
-        # Verify file content is valid JSON and can be loaded back
-        loaded_state = FinancialState.from_json_file(temp_path)
-        assert len(loaded_state.income_entries) == 1
-        assert loaded_state.income_entries[0].description == "Test entry"
 
-    finally:
-        # Clean up
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
+def test_financial_state_to_json_file_writes_through_symlink(tmp_path):
+    """Test that saving through a symlink updates its target, keeping the link."""
+    (tmp_path / "sync").mkdir()
+    real_path = tmp_path / "sync" / "state.json"
+    link_path = tmp_path / "state.json"
+    FinancialState(currency_code="USD").to_json_file(str(real_path))
+    link_path.symlink_to(real_path)
+
+    FinancialState(currency_code="BRL").to_json_file(str(link_path))
+
+    assert link_path.is_symlink()
+    assert FinancialState.from_json_file(str(real_path)).currency_code == "BRL"
+    assert os.listdir(tmp_path / "sync") == ["state.json"]
+
+
+def test_financial_state_to_json_file_removes_temp_file_on_error(tmp_path, monkeypatch):
+    """Test that a failed write keeps the old state file and no temp file."""
+    file_path = str(tmp_path / "state.json")
+    FinancialState(currency_code="USD").to_json_file(file_path)
+
+    def fail_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail_replace)
+    with pytest.raises(OSError):
+        FinancialState(currency_code="BRL").to_json_file(file_path)
+
+    assert FinancialState.from_json_file(file_path).currency_code == "USD"
+    assert os.listdir(tmp_path) == ["state.json"]
 
 
 def test_financial_state__get_entries_for_month():
@@ -377,3 +427,181 @@ def test_financial_state__get_entries_for_month():
     assert "Rent" in april_descriptions
     assert "Groceries" in april_descriptions
     assert "Vacation" not in april_descriptions  # One-time in March only
+
+
+def test_financial_state__get_monthly_forecast__sums_fractional_amounts():
+    state = FinancialState()
+    for amount in ("10.10", "20.20", "0.05"):
+        state.add_entry(
+            FinancialEntry(
+                amount=Decimal(amount),
+                description="Snack",
+                type=EntryType.EXPENSE,
+                category="Food",
+                recurrence=Recurrence(
+                    type=RecurrenceType.MONTHLY,
+                    start_date=date(2024, 1, 1),
+                ),
+            )
+        )
+    state.add_entry(
+        FinancialEntry(
+            amount=Decimal("0"),
+            description="Free trial",
+            type=EntryType.EXPENSE,
+            category="Streaming",
+            recurrence=Recurrence(
+                type=RecurrenceType.MONTHLY,
+                start_date=date(2024, 1, 1),
+            ),
+        )
+    )
+    # when:
+    forecast = state.get_monthly_forecast(date(2024, 1, 1))
+    # then:
+    assert forecast.expenses_by_category == {
+        "Food": Decimal("30.35"),
+        "Streaming": Decimal("0"),
+    }
+    assert forecast.total_expenses == Decimal("30.35")
+
+
+def test_financial_state__get_monthly_forecast__reflects_entry_changes():
+    state = FinancialState()
+    salary = FinancialEntry(
+        amount=Decimal("1000"),
+        description="Salary",
+        type=EntryType.INCOME,
+        category="Job",
+        recurrence=Recurrence(
+            type=RecurrenceType.MONTHLY,
+            start_date=date(2024, 1, 1),
+        ),
+    )
+    month = date(2024, 1, 1)
+    assert state.get_monthly_forecast(month).total_income == Decimal("0")
+
+    state.add_entry(salary)
+    assert state.get_monthly_forecast(month).total_income == Decimal("1000")
+    # unchanged entries give back the same forecast
+    assert state.get_monthly_forecast(month) is state.get_monthly_forecast(month)
+
+    state.replace_entry(0, salary.model_copy(update={"amount": Decimal("1200")}))
+    assert state.get_monthly_forecast(month).total_income == Decimal("1200")
+
+    state.remove_entry(state.income_entries[0])
+    assert state.get_monthly_forecast(month).total_income == Decimal("0")
+
+
+def test_financial_state__add_entries():
+    state = FinancialState()
+    month = date(2024, 1, 1)
+    assert state.get_monthly_forecast(month).total_income == Decimal("0")
+    rent = FinancialEntry(
+        amount=Decimal("800"),
+        description="Rent",
+        type=EntryType.EXPENSE,
+        category="Housing",
+        recurrence=Recurrence(type=RecurrenceType.MONTHLY, start_date=month),
+    )
+    salary = rent.model_copy(
+        update={"description": "Salary", "type": EntryType.INCOME, "category": "Job"}
+    )
+    # when:
+    state.add_entries([rent, salary])
+    # then:
+    assert state.expense_entries == (rent,)
+    assert state.income_entries == (salary,)
+    # the forecast computed before adding the entries isn't reused
+    forecast = state.get_monthly_forecast(month)
+    assert forecast.total_income == Decimal("800")
+    assert forecast.total_expenses == Decimal("800")
+
+
+def test_financial_state__entries_changed_directly():
+    salary = FinancialEntry(
+        amount=Decimal("1000"),
+        description="Salary",
+        type=EntryType.INCOME,
+        category="Job",
+        recurrence=Recurrence(type=RecurrenceType.MONTHLY, start_date=date(2024, 1, 1)),
+    )
+    state = FinancialState()
+    month = date(2024, 1, 1)
+    assert state.get_monthly_forecast(month).total_income == Decimal("0")
+
+    # the entries can't be changed in place, bypassing the caches
+    with pytest.raises(AttributeError):
+        state.income_entries.append(salary)
+
+    # and replacing them directly is picked up
+    state.all_entries[EntryType.INCOME] = (salary,)
+    assert state.get_monthly_forecast(month).total_income == Decimal("1000")
+    assert state.get_entries_for_month(month) == [salary]
+
+    state.all_entries = {EntryType.INCOME: (), EntryType.EXPENSE: ()}
+    assert state.get_monthly_forecast(month).total_income == Decimal("0")
+    assert state.get_entries_for_month(month) == []
+
+
+def test_financial_state__get_monthly_forecast__sums_sub_cent_amounts_exactly():
+    state = FinancialState()
+    month = date(2024, 1, 1)
+    recurrence = Recurrence(type=RecurrenceType.MONTHLY, start_date=month)
+    state.add_entries(
+        FinancialEntry(
+            amount=Decimal(amount),
+            description=f"Fee {i}",
+            type=EntryType.EXPENSE,
+            category="Fees",
+            recurrence=recurrence,
+        )
+        for i, amount in enumerate(["0.333", "0.333", "0.333", "10.5"])
+    )
+    state.add_entry(
+        FinancialEntry(
+            amount=Decimal("1000.0001"),
+            description="Salary",
+            type=EntryType.INCOME,
+            category="Job",
+            recurrence=recurrence,
+        )
+    )
+
+    forecast = state.get_monthly_forecast(month)
+    # the same totals as summing the Decimal amounts, nothing rounded to cents
+    assert forecast.expenses_by_category == {"Fees": Decimal("11.499")}
+    assert forecast.total_expenses == Decimal("11.499")
+    assert forecast.total_income == Decimal("1000.0001")
+    assert forecast.balance == Decimal("988.5011")
+
+
+def test_recurrence__month_mask():
+    def months_in_mask(recurrence):
+        return [m for m in range(1, 13) if recurrence.month_mask & (1 << (m - 1))]
+
+    start_date = date(2024, 3, 10)
+    monthly = Recurrence(type=RecurrenceType.MONTHLY, start_date=start_date)
+    every_4 = Recurrence(type=RecurrenceType.MONTHLY, start_date=start_date, every=4)
+    annual = Recurrence(type=RecurrenceType.ANNUAL, start_date=start_date)
+    one_time = Recurrence(type=RecurrenceType.ONE_TIME, start_date=start_date)
+
+    assert months_in_mask(monthly) == list(range(1, 13))
+    assert months_in_mask(every_4) == [3, 7, 11]
+    assert months_in_mask(annual) == [3]
+    assert months_in_mask(one_time) == [3]
+
+
+def test_add_months():
+    assert add_months(date(2024, 11, 15), [0, 1, 2, -11]) == [
+        date(2024, 11, 15),
+        date(2024, 12, 15),
+        date(2025, 1, 15),
+        date(2023, 12, 15),
+    ]
+    # the day is clamped to the end of shorter months
+    assert add_months(date(2024, 1, 31), [1, 2, 13]) == [
+        date(2024, 2, 29),
+        date(2024, 3, 31),
+        date(2025, 2, 28),
+    ]